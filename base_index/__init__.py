@@ -0,0 +1 @@
+default_app_config = "base_index.apps.BaseIndexConfig"
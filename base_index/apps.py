@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class BaseIndexConfig(AppConfig):
+    name = "base_index"
+
+    def ready(self):
+        from base_index.views import connect_home_cache_models
+        from packages.drf.caching import connect_cached_models
+        from utils.app_utils import registry
+        from utils.iam_permission import connect_iam_write_listener
+
+        # 预先解析跨app调用的目标，避免首个请求承担导入开销
+        registry.warm_up(getattr(settings, "APP_UTILS_WARM_UP_TARGETS", ()))
+        # 所有进程(包括 celery worker)都连接接口缓存的失效信号，见 packages.drf.caching
+        connect_cached_models(getattr(settings, "DRF_CACHED_MODELS", ()))
+        # 任何进程调用IAM写接口后都失效权限快照，见 utils.iam_permission
+        connect_iam_write_listener()
+        # 首页初始化数据依赖的模型变更后失效首页缓存
+        connect_home_cache_models(getattr(settings, "HOME_INIT_DATA_MODELS", ()))
@@ -1,14 +1,138 @@
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from utils import constants
+from utils.app_log import logger
+from utils.app_utils import registry
+
+INIT_DATA_MODULE = "home_application.views"
+INIT_DATA_FUNC = "get_init_data"
+HOME_TEMPLATE = "index.prod.html"
+
+HOME_CACHE_VERSION_KEY = "base_index:home:version"
 
-from utils.app_utils import AppUtils
+
+def get_home_cache_version():
+    return cache.get(HOME_CACHE_VERSION_KEY) or 0
+
+
+def invalidate_home_cache():
+    """
+    首页初始化数据变更(如系统配置、菜单修改)后调用，失效初始化数据及所有用户的首页缓存
+    settings.HOME_INIT_DATA_MODELS 中的模型保存、删除时自动调用
+    """
+    try:
+        cache.incr(HOME_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(HOME_CACHE_VERSION_KEY, 1, None)
+
+
+def invalidate_home_cache_receiver(sender, **kwargs):
+    invalidate_home_cache()
+
+
+def connect_home_cache_models(models):
+    """
+    模型保存、删除时失效首页缓存，在 AppConfig.ready() 中调用
+    :param models: 影响首页初始化数据的模型 ["app_label.ModelName", ...]
+    """
+    for label in models:
+        model = apps.get_model(label)
+        dispatch_uid = "base_index:home:{}".format(model._meta.label_lower)
+        post_save.connect(invalidate_home_cache_receiver, sender=model, dispatch_uid=dispatch_uid)
+        post_delete.connect(invalidate_home_cache_receiver, sender=model, dispatch_uid=dispatch_uid)
+
+
+def get_init_data_cache_key(request, version):
+    """
+    get_init_data 可能通过 utils.locals 读取当前用户，返回的内容按用户、权限范围及语言区分缓存
+    """
+    user = request.user
+    parts = [
+        user.get_username(),
+        "superuser" if user.is_superuser else "user",
+        translation.get_language() or "",
+        str(version),
+    ]
+    digest = hashlib.md5("\n".join(parts).encode("utf-8")).hexdigest()
+    return "base_index:init_data:{}".format(digest)
+
+
+def get_init_data(request, version):
+    """
+    按用户缓存首页初始化数据
+    :return: 初始化数据，获取失败时返回 None
+    """
+    cache_key = get_init_data_cache_key(request, version)
+    init_data = cache.get(cache_key) if constants.HOME_INIT_DATA_CACHE_TTL else None
+    if init_data is not None:
+        return init_data
+
+    try:
+        init_data = registry.call(INIT_DATA_MODULE, INIT_DATA_FUNC) or {}
+    except Exception:
+        logger.exception("[home] 获取首页初始化数据失败")
+        return None
+    if constants.HOME_INIT_DATA_CACHE_TTL:
+        cache.set(cache_key, init_data, constants.HOME_INIT_DATA_CACHE_TTL)
+    return init_data
+
+
+def get_page_cache_key(request, version):
+    """
+    页面中包含用户信息、当前路径(APP_PATH)及 csrf token，按这些维度缓存
+    没有 csrf cookie 时(首次访问)返回 None，不使用缓存，由本次渲染下发 cookie
+    """
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    if not csrf_cookie or request.method not in ("GET", "HEAD"):
+        return None
+    parts = [
+        request.user.get_username(),
+        translation.get_language() or "",
+        csrf_cookie,
+        request.get_full_path(),
+        settings.STATIC_VERSION,
+        str(version),
+    ]
+    digest = hashlib.md5("\n".join(parts).encode("utf-8")).hexdigest()
+    return "base_index:home:{}".format(digest)
 
 
 def home(request):
     """
     首页
     """
-    utils = AppUtils()
-    init_data = utils.interface_call('home_application.views', 'get_init_data', {})
-    response = render(request, "index.prod.html", init_data)
+    version = get_home_cache_version()
+    cache_key = get_page_cache_key(request, version) if constants.HOME_PAGE_CACHE_TTL else None
+    page = cache.get(cache_key) if cache_key else None
+    if page is None:
+        init_data = get_init_data(request, version)
+        if cache_key is None or init_data is None:
+            # 初始化数据获取失败时以空数据渲染，不缓存页面，下次请求重新获取
+            response = render(request, HOME_TEMPLATE, init_data or {})
+            response.set_cookie("current_ip", getattr(request, "current_ip", "127.0.0.1"), httponly=True)
+            return response
+        content = render_to_string(HOME_TEMPLATE, init_data, request)
+        page = {"content": content, "etag": quote_etag(hashlib.md5(content.encode("utf-8")).hexdigest())}
+        cache.set(cache_key, page, constants.HOME_PAGE_CACHE_TTL)
+    else:
+        # 与渲染时一致，标记 csrf token 已使用，由 CsrfViewMiddleware 续期 cookie
+        get_token(request)
+
+    response = HttpResponse(page["content"])
+    response["ETag"] = page["etag"]
+    response["Cache-Control"] = "private, no-cache"
+    response = get_conditional_response(request, etag=page["etag"], response=response)
     response.set_cookie("current_ip", getattr(request, "current_ip", "127.0.0.1"), httponly=True)
     return response
@@ -11,13 +11,16 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import hashlib
 import logging
+import time
 
 from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.utils.translation import ugettext_lazy as _
 
 from blueapps.account import get_user_model
+from blueapps.core.cache.backends import LocalLRUCache
 
 bkoauth_jwt_client_exists = True
 try:
@@ -25,8 +28,57 @@ try:
 except ImportError:
     bkoauth_jwt_client_exists = False
 
+try:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+except ImportError:
+    load_pem_public_key = None
+
 logger = logging.getLogger("component")
 
+# 校验通过的 JWT 结果缓存, key 为 JWT 及公钥的摘要
+verified_jwt_cache = LocalLRUCache(settings.BK_JWT_LOCAL_CACHE_SIZE)
+
+# 已解析的网关公钥, key 为 PEM 的摘要; 公钥对象不可 pickle 且不会被修改，直接保存
+public_key_cache = LocalLRUCache(settings.BK_JWT_PUBLIC_KEY_CACHE_SIZE, pickled=False)
+
+
+def load_public_key(pem):
+    """
+    解析 PEM 格式的网关公钥并缓存，避免每次校验都重新解析
+    解析失败时返回原始内容，交由 PyJWT 处理
+    """
+    if load_pem_public_key is None or not pem:
+        return pem
+    data = pem.encode("utf-8") if not isinstance(pem, bytes) else pem
+    key = hashlib.sha256(data).hexdigest()
+    public_key = public_key_cache.get(key)
+    if public_key is not None:
+        return public_key
+
+    try:
+        public_key = load_pem_public_key(data, backend=default_backend())
+    except Exception:
+        logger.exception(u"[BK_JWT]解析网关公钥失败")
+        return pem
+    public_key_cache.set(key, public_key, settings.BK_JWT_PUBLIC_KEY_CACHE_EXPIRED)
+    return public_key
+
+
+if bkoauth_jwt_client_exists:
+
+    class CachedKeyJWTClient(JWTClient):
+        def _get_jwt_public_key(self):
+            return load_public_key(super(CachedKeyJWTClient, self)._get_jwt_public_key())
+
+
+def get_jwt_cache_key(request):
+    raw_jwt = request.META.get(JWTClient.JWT_KEY_NAME, "")
+    if not raw_jwt:
+        return None
+    public_key = request.META.get(JWTClient.JWT_PUBLIC_KEY_HEADER_NAME, "")
+    return hashlib.sha256("{}\n{}".format(raw_jwt, public_key).encode("utf-8")).hexdigest()
+
 
 class BkJwtBackend(ModelBackend):
     def authenticate(self, request=None):
@@ -45,9 +97,13 @@ class BkJwtBackend(ModelBackend):
         user_info = verify_data["data"]["user"]
         user_model = get_user_model()
         try:
-            user, _ = user_model.objects.get_or_create(username=user_info["bk_username"])
-            user.nickname = user_info["bk_username"]
-            user.save()
+            user, created = user_model.objects.get_or_create(
+                username=user_info["bk_username"], defaults={"nickname": user_info["bk_username"]}
+            )
+            # 只在昵称变化时才更新，避免每次请求都写用户表
+            if not created and user.nickname != user_info["bk_username"]:
+                user.nickname = user_info["bk_username"]
+                user.save(update_fields=["nickname"])
         except Exception as e:
             logger.exception(u"自动创建 & 更新 User Model 失败: %s" % e)
             return None
@@ -86,7 +142,15 @@ class BkJwtBackend(ModelBackend):
             ret["message"] = _(u"bkoauth暂不支持JWT协议")
             return ret
 
-        jwt = JWTClient(request)
+        cache_key = get_jwt_cache_key(request)
+        if cache_key:
+            cached_data = verified_jwt_cache.get(cache_key)
+            if cached_data is not None:
+                ret["result"] = True
+                ret["data"] = {"user": dict(cached_data["user"]), "app": dict(cached_data["app"])}
+                return ret
+
+        jwt = CachedKeyJWTClient(request)
         if not jwt.is_valid:
             ret["message"] = _(u"jwt_invalid: %s") % jwt.error_message
             return ret
@@ -118,4 +182,11 @@ class BkJwtBackend(ModelBackend):
 
         ret["result"] = True
         ret["data"] = {"user": user, "app": app}
+
+        # 缓存到 JWT 过期为止，且不超过 BK_JWT_CACHE_EXPIRED
+        timeout = settings.BK_JWT_CACHE_EXPIRED
+        if jwt.payload.get("exp"):
+            timeout = min(timeout, jwt.payload["exp"] - time.time())
+        if cache_key and timeout > 0:
+            verified_jwt_cache.set(cache_key, {"user": dict(user), "app": dict(app)}, timeout)
         return ret
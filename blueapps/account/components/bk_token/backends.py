@@ -19,6 +19,7 @@ from django.contrib.auth.backends import ModelBackend
 from django.db import IntegrityError
 
 from blueapps.account import get_user_model
+from blueapps.account.components.bk_token.token_cache import token_single_flight, verified_token_cache
 from blueapps.account.conf import ConfFixture
 from blueapps.account.utils.http import send
 from blueapps.utils import client
@@ -35,6 +36,33 @@ class TokenBackend(ModelBackend):
         if not bk_token:
             return None
 
+        is_cached, user = self.authenticate_from_cache(bk_token)
+        if is_cached:
+            return user
+
+        # 同一个 bk_token 并发认证时只有一个请求访问登录服务，其余请求等待后直接读取其缓存结果
+        with token_single_flight(bk_token) as waited:
+            if waited:
+                is_cached, user = self.authenticate_from_cache(bk_token)
+                if is_cached:
+                    return user
+            return self.authenticate_by_login_service(bk_token)
+
+    @staticmethod
+    def authenticate_from_cache(bk_token):
+        """
+        使用缓存的 bk_token 校验结果认证
+        @return: (是否命中缓存, user)
+        """
+        cached = verified_token_cache.get(bk_token)
+        if cached is None:
+            return False, None
+        if not cached["valid"]:
+            return True, None
+        user = get_user_model().objects.filter(username=cached["username"]).first()
+        return user is not None, user
+
+    def authenticate_by_login_service(self, bk_token):
         verify_result, username = self.verify_bk_token(bk_token)
         # 判断bk_token是否验证通过,不通过则返回None
         if not verify_result:
@@ -47,23 +75,29 @@ class TokenBackend(ModelBackend):
             # 判断是否获取到用户信息,获取不到则返回None
             if not get_user_info_result:
                 return None
-            user.set_property(key="qq", value=user_info.get("qq", ""))
-            user.set_property(key="language", value=user_info.get("language", ""))
-            user.set_property(key="time_zone", value=user_info.get("time_zone", ""))
-            user.set_property(key="role", value=user_info.get("role", ""))
-            user.set_property(key="phone", value=user_info.get("phone", ""))
-            user.set_property(key="email", value=user_info.get("email", ""))
-            user.set_property(key="wx_userid", value=user_info.get("wx_userid", ""))
-            user.set_property(key="chname", value=user_info.get("chname", ""))
+            user.set_properties(
+                {
+                    "qq": user_info.get("qq", ""),
+                    "language": user_info.get("language", ""),
+                    "time_zone": user_info.get("time_zone", ""),
+                    "role": user_info.get("role", ""),
+                    "phone": user_info.get("phone", ""),
+                    "email": user_info.get("email", ""),
+                    "wx_userid": user_info.get("wx_userid", ""),
+                    "chname": user_info.get("chname", ""),
+                }
+            )
 
             # 用户如果不是管理员，则需要判断是否存在平台权限，如果有则需要加上
             if not user.is_superuser and not user.is_staff:
                 role = user_info.get("role", "")
                 is_admin = True if str(role) == ROLE_TYPE_ADMIN else False
-                user.is_superuser = is_admin
-                user.is_staff = is_admin
-                user.save()
+                if user.is_superuser != is_admin or user.is_staff != is_admin:
+                    user.is_superuser = is_admin
+                    user.is_staff = is_admin
+                    user.save(update_fields=["is_superuser", "is_staff"])
 
+            verified_token_cache.set_valid(bk_token, username, user_info)
             return user
 
         except IntegrityError:
@@ -160,4 +194,6 @@ class TokenBackend(ModelBackend):
             error_msg = response.get("message", "")
             error_data = response.get("data", "")
             logger.error(u"Fail to verify bk_token, error={}, ret={}".format(error_msg, error_data))
+            # 仅登录服务明确返回校验失败时才做负缓存，网络异常等情况不缓存
+            verified_token_cache.set_invalid(bk_token)
             return False, None
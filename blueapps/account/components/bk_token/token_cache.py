@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from blueapps.core.cache.backends import LocalLRUCache
+
+logger = logging.getLogger("component")
+
+
+class VerifiedTokenCache(object):
+    """
+    bk_token 校验结果的两级缓存: 进程内 LRU + 共享缓存(redis)
+    - 缓存 key 为 bk_token 的摘要，不落明文
+    - 校验通过的条目缓存用户名及用户信息，有效期不超过登录缓存时间(LOGIN_CACHE_EXPIRED)
+    - 校验不通过的条目短时间负缓存，避免同一个无效 token 被反复校验
+    """
+
+    key_prefix = "bk_token_verify"
+
+    def __init__(self, alias=None, ttl=None, negative_ttl=None, local_size=None):
+        self.alias = alias or settings.BK_TOKEN_CACHE_ALIAS
+        self.ttl = min(ttl or settings.BK_TOKEN_CACHE_TTL, settings.LOGIN_CACHE_EXPIRED)
+        self.negative_ttl = negative_ttl or settings.BK_TOKEN_NEGATIVE_CACHE_TTL
+        self.local = LocalLRUCache(local_size or settings.BK_TOKEN_LOCAL_CACHE_SIZE)
+
+    @property
+    def shared(self):
+        if self.alias not in settings.CACHES:
+            return None
+        return caches[self.alias]
+
+    def make_key(self, bk_token):
+        digest = hashlib.sha256(bk_token.encode("utf-8")).hexdigest()
+        return "{}:{}".format(self.key_prefix, digest)
+
+    def get(self, bk_token):
+        """
+        @return: None 表示未命中, 否则为 {"valid": bool, "username": str, "user_info": dict, "expires_at": float}
+        """
+        key = self.make_key(bk_token)
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+
+        shared = self.shared
+        if shared is None:
+            return None
+        try:
+            entry = shared.get(key)
+        except Exception:
+            logger.exception(u"Fail to get bk_token verify result from cache")
+            return None
+        if entry is None:
+            return None
+        remaining = entry["expires_at"] - time.time()
+        if remaining <= 0:
+            return None
+        self.local.set(key, entry, remaining)
+        return entry
+
+    def set_valid(self, bk_token, username, user_info):
+        self._set(bk_token, {"valid": True, "username": username, "user_info": user_info}, self.ttl)
+
+    def set_invalid(self, bk_token):
+        self._set(bk_token, {"valid": False, "username": None, "user_info": None}, self.negative_ttl)
+
+    def delete(self, bk_token):
+        key = self.make_key(bk_token)
+        self.local.delete(key)
+        shared = self.shared
+        if shared is not None:
+            try:
+                shared.delete(key)
+            except Exception:
+                logger.exception(u"Fail to delete bk_token verify result from cache")
+
+    def _set(self, bk_token, entry, ttl):
+        key = self.make_key(bk_token)
+        entry["expires_at"] = time.time() + ttl
+        self.local.set(key, entry, ttl)
+        shared = self.shared
+        if shared is not None:
+            try:
+                shared.set(key, entry, ttl)
+            except Exception:
+                logger.exception(u"Fail to set bk_token verify result to cache")
+
+
+class TokenSingleFlight(object):
+    """
+    同一个 bk_token 的认证合并，同一时间只有一个请求向登录服务校验，其他请求等待其结果
+    - 进程内通过 threading.Event 合并
+    - 开启 BK_TOKEN_SINGLE_FLIGHT_REDIS_LOCK 且共享缓存支持 lock(django_redis)时，跨进程通过 redis 锁合并
+
+    with token_single_flight(bk_token) as waited:
+        if waited:
+            # 等待过其他请求，优先读取其写入的缓存
+            ...
+    """
+
+    def __init__(self, token_cache, timeout=None, use_redis_lock=None):
+        self.token_cache = token_cache
+        self.timeout = timeout or settings.BK_TOKEN_SINGLE_FLIGHT_TIMEOUT
+        if use_redis_lock is None:
+            use_redis_lock = settings.BK_TOKEN_SINGLE_FLIGHT_REDIS_LOCK
+        self.use_redis_lock = use_redis_lock
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def __call__(self, bk_token):
+        key = self.token_cache.make_key(bk_token)
+        with self._lock:
+            event = self._flights.get(key)
+            if event is None:
+                self._flights[key] = threading.Event()
+
+        if event is not None:
+            # 已有其他线程在认证，等待其完成；超时或其认证失败时由调用方自行认证
+            event.wait(self.timeout)
+            yield True
+            return
+
+        try:
+            shared_lock, waited = self._acquire_shared_lock(key)
+            try:
+                yield waited
+            finally:
+                self._release_shared_lock(shared_lock)
+        finally:
+            with self._lock:
+                self._flights.pop(key).set()
+
+    def _acquire_shared_lock(self, key):
+        """
+        @return: (redis 锁, 是否等待过其他进程)
+        """
+        shared = self.token_cache.shared
+        if not self.use_redis_lock or shared is None or not hasattr(shared, "lock"):
+            return None, False
+        try:
+            lock = shared.lock("{}:lock".format(key), timeout=self.timeout)
+            if lock.acquire(blocking=False):
+                return lock, False
+            if lock.acquire(blocking=True, blocking_timeout=self.timeout):
+                return lock, True
+        except Exception:
+            logger.exception(u"Fail to acquire bk_token authenticate lock")
+            return None, False
+        return None, True
+
+    @staticmethod
+    def _release_shared_lock(lock):
+        if lock is None:
+            return
+        try:
+            lock.release()
+        except Exception:
+            # 锁已超时释放等情况
+            logger.exception(u"Fail to release bk_token authenticate lock")
+
+
+verified_token_cache = VerifiedTokenCache()
+token_single_flight = TokenSingleFlight(verified_token_cache)
@@ -21,6 +21,7 @@ import traceback
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core import validators
+from django.core.cache import cache
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -117,16 +118,68 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         return self.nickname
 
+    @property
+    def property_cache_key(self):
+        return "user_properties:{}".format(self.pk)
+
+    @property
+    def property_bag(self):
+        """
+        用户的全部属性 {key: value}
+        首次访问时从共享缓存或数据库(1 次查询)加载，之后缓存在用户对象上
+        """
+        bag = self.__dict__.get("_property_bag")
+        if bag is None:
+            bag = cache.get(self.property_cache_key)
+            if bag is None:
+                bag = dict(self.properties.values_list("key", "value"))
+                cache.set(self.property_cache_key, bag, settings.USER_PROPERTY_CACHE_EXPIRED)
+            self.__dict__["_property_bag"] = bag
+        return bag
+
+    def invalidate_properties(self):
+        self.__dict__.pop("_property_bag", None)
+        cache.delete(self.property_cache_key)
+
     def get_property(self, key):
-        try:
-            return self.properties.get(key=key).value
-        except UserProperty.DoesNotExist:
-            return None
+        return self.property_bag.get(key)
 
     def set_property(self, key, value):
         key_property, _ = self.properties.get_or_create(key=key)
         key_property.value = value
         key_property.save()
+        self.invalidate_properties()
+
+    def set_properties(self, properties):
+        """
+        批量设置用户属性，只写入新增或值发生变化的属性
+        查询 1 次，新增与更新各最多 1 次，值均未变化时不产生写操作
+        @param properties: {key: value}
+        @return: 实际写入的属性 key 列表
+        """
+        properties = {key: "" if value is None else str(value) for key, value in properties.items()}
+        if not properties:
+            return []
+
+        queryset = self.properties.filter(key__in=list(properties.keys())).only("id", "user_id", "key", "value")
+        existing = {prop.key: prop for prop in queryset}
+        to_create, to_update = [], []
+        for key, value in properties.items():
+            prop = existing.get(key)
+            if prop is None:
+                to_create.append(UserProperty(user=self, key=key, value=value))
+            elif prop.value != value:
+                prop.value = value
+                to_update.append(prop)
+
+        if to_create:
+            # 并发登录时可能已被其他请求创建，忽略唯一键冲突
+            UserProperty.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_update:
+            UserProperty.objects.bulk_update(to_update, ["value"])
+        if to_create or to_update:
+            self.invalidate_properties()
+        return [prop.key for prop in to_create + to_update]
 
     @property
     def avatar_url(self):
@@ -199,6 +252,36 @@ class User(AbstractBaseUser, PermissionsMixin):
         return False
 
 
+def prefetch_properties(users):
+    """
+    为一批用户预加载属性，供列表页等场景使用，避免逐个用户查询
+    优先读取共享缓存，未命中的用户通过 1 次查询加载
+    @param users: User 对象列表
+    @return: users
+    """
+    pending = [user for user in users if "_property_bag" not in user.__dict__]
+    if not pending:
+        return users
+
+    cache_keys = {user.property_cache_key: user for user in pending}
+    cached = cache.get_many(list(cache_keys.keys()))
+    for key, bag in cached.items():
+        cache_keys[key].__dict__["_property_bag"] = bag
+
+    missing = {user.pk: user for key, user in cache_keys.items() if key not in cached}
+    if missing:
+        bags = {pk: {} for pk in missing}
+        rows = UserProperty.objects.filter(user_id__in=list(missing.keys())).values_list("user_id", "key", "value")
+        for user_id, key, value in rows:
+            bags[user_id][key] = value
+        for pk, bag in bags.items():
+            missing[pk].__dict__["_property_bag"] = bag
+        cache.set_many(
+            {missing[pk].property_cache_key: bag for pk, bag in bags.items()}, settings.USER_PROPERTY_CACHE_EXPIRED
+        )
+    return users
+
+
 class UserProperty(models.Model):
     """
     Add user extra property
@@ -13,18 +13,97 @@ specific language governing permissions and limitations under the License.
 
 import json
 import logging
+import threading
+import time
 import traceback
 
 import requests
+from django.conf import settings
 from django.http import QueryDict
 from django.shortcuts import resolve_url
 from django.utils.six.moves.urllib.parse import urlparse, urlunparse
 from django.utils.translation import gettext_lazy as _
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from blueapps.core.exceptions.base import ApiNetworkError, ApiResultError
 
 logger = logging.getLogger("component")
 
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    获取进程内共享的 requests session，复用连接池避免每次请求重新建立 TCP/TLS 连接
+    requests.Session 的请求方法是线程安全的，调用方不要修改 session 上的 headers 等公共状态
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def build_session():
+    retry_kwargs = {
+        "total": settings.BK_HTTP_MAX_RETRIES,
+        "backoff_factor": 0.1,
+        "status_forcelist": (502, 503, 504),
+        "raise_on_status": False,
+    }
+    # 只对幂等的 GET 请求重试读超时及错误状态码，连接失败时所有方法都会重试
+    try:
+        retry = Retry(allowed_methods=frozenset(["GET"]), **retry_kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        retry = Retry(method_whitelist=frozenset(["GET"]), **retry_kwargs)
+
+    adapter = HTTPAdapter(
+        pool_connections=settings.BK_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.BK_HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HttpMetrics(object):
+    """
+    按目标地址(不含查询参数)统计请求次数、失败次数及耗时
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def record(self, url, cost, failed=False):
+        target = url.split("?", 1)[0]
+        with self._lock:
+            item = self._data.setdefault(target, {"count": 0, "failed": 0, "total_time": 0.0, "max_time": 0.0})
+            item["count"] += 1
+            item["failed"] += int(failed)
+            item["total_time"] += cost
+            item["max_time"] = max(item["max_time"], cost)
+
+    def snapshot(self):
+        """
+        @return: {url: {"count", "failed", "total_time", "max_time", "avg_time"}}，耗时单位秒
+        """
+        with self._lock:
+            return {url: dict(item, avg_time=item["total_time"] / item["count"]) for url, item in self._data.items()}
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+http_metrics = HttpMetrics()
+
 
 def send(url, method, params, timeout=None, **kwargs):
     """
@@ -40,21 +119,37 @@ def send(url, method, params, timeout=None, **kwargs):
     @param params：dict，请求参数 KV 结构
     @param timeout: float，服务器在 timeout 秒内没有应答，将会引发一个异常
     """
-    session = requests.session()
+    session = get_session()
+    if timeout is None:
+        timeout = settings.BK_HTTP_TIMEOUT
 
+    start = time.time()
     try:
         if method.upper() == "GET":
             response = session.request(method="GET", url=url, params=params, timeout=timeout, **kwargs)
         elif method.upper() == "POST":
-            session.headers.update({"Content-Type": "application/json; chartset=utf-8"})
-            response = session.request(method="POST", url=url, data=json.dumps(params), timeout=timeout, **kwargs)
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.setdefault("Content-Type", "application/json; chartset=utf-8")
+            response = session.request(
+                method="POST", url=url, data=json.dumps(params), timeout=timeout, headers=headers, **kwargs
+            )
         else:
             raise Exception(_(u"异常请求方式，%s") % method)
     except requests.exceptions.Timeout:
+        http_metrics.record(url, time.time() - start, failed=True)
         err_msg = _(u"请求超时，url=%s，method=%s，params=%s，timeout=%s") % (url, method, params, timeout)
         raise ApiNetworkError(err_msg)
+    except requests.exceptions.ConnectionError:
+        http_metrics.record(url, time.time() - start, failed=True)
+        err_msg = _(u"请求连接失败，url=%s，method=%s，params=%s") % (url, method, params)
+        raise ApiNetworkError(err_msg)
+
+    cost = time.time() - start
+    http_metrics.record(url, cost, failed=response.status_code != requests.codes.ok)
 
-    logger.debug("请求记录, url={}, method={}, params={}, response={}".format(url, method, params, response))
+    logger.debug(
+        "请求记录, url={}, method={}, params={}, response={}, cost={:.3f}s".format(url, method, params, response, cost)
+    )
 
     if response.status_code != requests.codes.ok:
         err_msg = _(u"返回异常状态码，status_code=%s，url=%s，method=%s，" u"params=%s") % (
@@ -142,3 +142,45 @@ LOG_DIR_PREFIX = "/app/v3logs/"
 
 # 登录缓存时间配置, 单位秒（与django cache单位一致）
 LOGIN_CACHE_EXPIRED = 60
+
+# bk_token 校验结果缓存配置, 单位秒
+# 共享缓存使用的 CACHES 别名, 不存在该别名时只使用进程内缓存
+BK_TOKEN_CACHE_ALIAS = "redis"
+BK_TOKEN_CACHE_TTL = LOGIN_CACHE_EXPIRED
+BK_TOKEN_NEGATIVE_CACHE_TTL = 10
+BK_TOKEN_LOCAL_CACHE_SIZE = 1000
+
+# 用户属性缓存时间, 单位秒
+USER_PROPERTY_CACHE_EXPIRED = 60 * 5
+
+# 登录相关 http 请求(blueapps.account.utils.http.send)配置
+# 默认超时时间, 单位秒
+BK_HTTP_TIMEOUT = 10
+# 连接池缓存的目标主机数及每个主机的最大连接数
+BK_HTTP_POOL_CONNECTIONS = 10
+BK_HTTP_POOL_MAXSIZE = 20
+# 失败重试次数
+BK_HTTP_MAX_RETRIES = 2
+
+# BK_JWT 校验结果的进程内缓存配置, 缓存时间不超过 JWT 本身的过期时间, 单位秒
+BK_JWT_CACHE_EXPIRED = 60 * 5
+BK_JWT_LOCAL_CACHE_SIZE = 1000
+# 已解析的网关公钥缓存，公钥来自请求头，限制条目数避免被不同的请求头撑大
+BK_JWT_PUBLIC_KEY_CACHE_SIZE = 16
+BK_JWT_PUBLIC_KEY_CACHE_EXPIRED = 60 * 60
+# blueapps.utils.esbclient 中自定义 esb api 对象的进程内缓存，按请求方法及用户凭证区分，限制条目数
+BK_ESB_CUSTOM_API_CACHE_SIZE = 256
+BK_ESB_CUSTOM_API_CACHE_EXPIRED = 60 * 60
+
+# 同一个 bk_token 并发认证时的最长等待时间, 单位秒
+BK_TOKEN_SINGLE_FLIGHT_TIMEOUT = 5
+# 是否使用 redis 锁在多进程间合并认证(需要 BK_TOKEN_CACHE_ALIAS 为 django_redis 缓存)
+BK_TOKEN_SINGLE_FLIGHT_REDIS_LOCK = False
+
+# 请求性能统计(blueapps.middleware.profiling.middlewares.ProfilingMiddleware)配置
+# 超级管理员携带该请求头时返回 cProfile 深度分析结果
+BK_PROFILING_HEADER = "HTTP_X_BK_PROFILE"
+# 深度分析的抽样比例(0 ~ 1), 抽样结果记录到 performance 日志
+BK_PROFILING_SAMPLE_RATE = 0
+# 深度分析结果输出的函数条数
+BK_PROFILING_TOP_N = 50
@@ -40,19 +40,45 @@ def get_logging_config_dict(settings_module):
         rand_str = "".join(random.sample(string.ascii_letters + string.digits, 4))
         log_name_prefix = "{}-{}".format(os.getenv("BKPAAS_PROCESS_TYPE"), rand_str)
 
-        logging_format = {
-            "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-            "fmt": (
-                "%(levelname)s %(asctime)s %(pathname)s %(lineno)d " "%(funcName)s %(process)d %(thread)d %(message)s"
-            ),
-        }
+        logging_format = None
+    # JSON 格式, extra 中的字段(如 performance 日志的 profile)作为独立字段输出
+    json_format = {
+        "()": "blueapps.core.log.formatters.JsonFormatter",
+        "fmt": "%(levelname)s %(asctime)s %(pathname)s %(lineno)d " "%(funcName)s %(process)d %(thread)d %(message)s",
+    }
+    logging_format = logging_format or json_format
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    return {
+    logging_config = {
         "version": 1,
         "disable_existing_loggers": False,
-        "formatters": {"verbose": logging_format, "simple": {"format": "%(levelname)s %(message)s"}},
+        "formatters": {
+            "verbose": logging_format,
+            "json": json_format,
+            "simple": {"format": "%(levelname)s %(message)s"},
+        },
+        "filters": {
+            # 按调用位置限流, 每个位置在 period 秒内最多输出 limit 条
+            "rate_limit": {
+                "()": "blueapps.core.log.filters.RateLimitFilter",
+                "name": "rate_limit",
+                "limit": settings_module.get("LOG_RATE_LIMIT", 20),
+                "period": settings_module.get("LOG_RATE_LIMIT_PERIOD", 60),
+            },
+            # INFO 及以下级别的日志按比例抽样
+            "sample": {
+                "()": "blueapps.core.log.filters.SamplingFilter",
+                "name": "sample",
+                "rate": settings_module.get("LOG_SAMPLE_RATE", 1.0),
+            },
+            # 截断过长的日志内容
+            "truncate": {
+                "()": "blueapps.core.log.filters.TruncateFilter",
+                "name": "truncate",
+                "max_length": settings_module.get("LOG_MAX_MESSAGE_LENGTH", 1024 * 10),
+            },
+        },
         "handlers": {
             "null": {"level": "DEBUG", "class": "logging.NullHandler"},
             "console": {"level": "DEBUG", "class": "logging.StreamHandler", "formatter": "simple"},
@@ -66,6 +92,7 @@ def get_logging_config_dict(settings_module):
             "component": {
                 "class": log_class,
                 "formatter": "verbose",
+                "filters": ["rate_limit", "truncate"],
                 "filename": os.path.join(log_dir, "%s-component.log" % log_name_prefix),
                 "maxBytes": 1024 * 1024 * 10,
                 "backupCount": 5,
@@ -87,15 +114,24 @@ def get_logging_config_dict(settings_module):
             "blueapps": {
                 "class": log_class,
                 "formatter": "verbose",
+                "filters": ["rate_limit", "truncate"],
                 "filename": os.path.join(log_dir, "%s-django.log" % log_name_prefix),
                 # TODO blueapps log 等待平台提供单独的路径
                 # log_dir, '%s-blueapps.log' % log_name_prefix),
                 "maxBytes": 1024 * 1024 * 10,
                 "backupCount": 5,
             },
+            "performance": {
+                "class": log_class,
+                "formatter": "json",
+                "filename": os.path.join(log_dir, "%s-performance.log" % log_name_prefix),
+                "maxBytes": 1024 * 1024 * 10,
+                "backupCount": 5,
+            },
             "cwapi": {
                 "class": log_class,
                 "formatter": "verbose",
+                "filters": ["sample", "truncate"],
                 "filename": os.path.join(log_dir, "%s-cw-api.log" % log_name_prefix),
                 "maxBytes": 1024 * 1024 * 10,
                 "backupCount": 5,
@@ -117,8 +153,37 @@ def get_logging_config_dict(settings_module):
             # 普通app日志
             "app": {"handlers": ["root"], "level": log_level, "propagate": True},
             # 性能日志
-            "performance": {"handlers": ["null"], "level": "INFO", "propagate": True},
+            "performance": {"handlers": ["performance"], "level": "INFO", "propagate": False},
             # 其他saas开放api日志
             "api": {"handlers": ["cwapi"], "level": "INFO", "propagate": True},
         },
     }
+
+    # 日志队列模式: 业务线程只负责入队，格式化及写文件由后台线程完成
+    if settings_module.get("LOG_QUEUE_ENABLED", False):
+        logging_config["handlers"] = get_queued_handlers(logging_config["handlers"], log_class, settings_module)
+    return logging_config
+
+
+def get_queued_handlers(handlers, log_class, settings_module):
+    """
+    将写文件的 handler 包装为 QueuedHandler
+    @param log_class: 需要包装的 handler 类
+    """
+    queued_handlers = {}
+    for name, handler in handlers.items():
+        if handler.get("class") != log_class:
+            queued_handlers[name] = handler
+            continue
+        handler = dict(handler)
+        queued_handler = {
+            "()": "blueapps.core.log.handlers.QueuedHandler",
+            "queue_size": settings_module.get("LOG_QUEUE_SIZE", 10000),
+            "overflow": settings_module.get("LOG_QUEUE_OVERFLOW", "drop"),
+        }
+        for key in ("level", "formatter", "filters"):
+            if key in handler:
+                queued_handler[key] = handler.pop(key)
+        queued_handler["handler"] = handler
+        queued_handlers[name] = queued_handler
+    return queued_handlers
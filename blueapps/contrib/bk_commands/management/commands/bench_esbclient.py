@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from blueapps.utils import client
+from blueapps.utils.request_provider import RequestProvider
+
+
+class Command(BaseCommand):
+    help = u"esb client 属性链(client.<collection>.<api>)解析耗时基准测试，不会发起真实请求"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=10000, help="每轮执行次数")
+        parser.add_argument("--repeat", type=int, default=5, help="执行轮数")
+        parser.add_argument("--collection", default="cc", help="esb collection 名称")
+        parser.add_argument("--api", default="search_host", help="esb api 名称")
+
+    def handle(self, **options):
+        number, repeat = options["number"], options["repeat"]
+        collection, api = options["collection"], options["api"]
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        provider = RequestProvider(get_response=None)
+        provider.process_request(request)
+
+        def resolve():
+            return getattr(getattr(client, collection), api)
+
+        def resolve_new_request():
+            # 模拟每个请求首次解析 sdk client
+            request.__dict__.pop("_blueapps_sdk_clients", None)
+            request.__dict__.pop("_blueapps_sdk_modules", None)
+            return resolve()
+
+        try:
+            resolve()
+            cases = [
+                ("client.{}.{} (same request)".format(collection, api), resolve),
+                ("client.{}.{} (new request)".format(collection, api), resolve_new_request),
+            ]
+            for name, func in cases:
+                best = min(timeit.repeat(func, number=number, repeat=repeat))
+                self.stdout.write("{:<50} {:>10.2f} us/op".format(name, best / number * 1000000))
+        finally:
+            provider.process_response(request, None)
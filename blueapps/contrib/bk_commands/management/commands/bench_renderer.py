@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+
+import datetime
+import decimal
+import timeit
+import uuid
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from packages.drf.renderers import CustomRenderer
+
+
+class FakeRequest(object):
+    method = "GET"
+
+
+class FakeResponse(object):
+    status_code = 200
+
+
+def make_rows(count):
+    """模拟列表接口的序列化结果，其中包含序列化器未转换的 datetime、Decimal、UUID"""
+    now = datetime.datetime(2020, 5, 1, 10, 0, 0, 123456)
+    return [
+        OrderedDict(
+            [
+                ("id", index),
+                ("uuid", uuid.UUID(int=index)),
+                ("name", u"主机-{}".format(index)),
+                ("ip", "10.0.{}.{}".format(index // 256, index % 256)),
+                ("is_active", index % 2 == 0),
+                ("cpu_usage", decimal.Decimal("{}.25".format(index % 100))),
+                ("tags", [u"生产", u"核心", "mysql"]),
+                ("extra", {"owner": "admin", "bk_biz_id": index % 10, "remark": None}),
+                ("created_by", "admin"),
+                ("created_at", "2020-05-01 10:00:00"),
+                ("updated_at", now + datetime.timedelta(seconds=index)),
+            ]
+        )
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = u"CustomRenderer 基准测试, 对比 DRF JSONRenderer 与 CustomRenderer 的编码耗时并校验输出一致"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="列表数据行数")
+        parser.add_argument("--number", type=int, default=20, help="每轮执行次数")
+        parser.add_argument("--repeat", type=int, default=5, help="执行轮数")
+
+    def handle(self, **options):
+        number, repeat = options["number"], options["repeat"]
+        data = make_rows(options["rows"])
+        context = {"request": FakeRequest(), "response": FakeResponse()}
+        envelope = {"result": True, "code": "20000", "message": "success", "data": data}
+
+        # 改造前: 构建外层字典后交给 DRF JSONRenderer 编码
+        expected = JSONRenderer().render(envelope, None, context)
+        cases = [
+            ("JSONRenderer (before)", lambda: JSONRenderer().render(envelope, None, context)),
+            ("CustomRenderer", lambda: CustomRenderer().render(data, None, context)),
+        ]
+
+        self.stdout.write("{} rows, {} bytes per response".format(len(data), len(expected)))
+        baseline = None
+        for name, func in cases:
+            if func() != expected:
+                raise CommandError(u"{} 输出与 JSONRenderer 不一致".format(name))
+            best = min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+            baseline = baseline or best
+            saved = (1 - best / baseline) * 100
+            self.stdout.write("{:<30} {:>10.2f} ms/request {:>8.1f}% saved".format(name, best, saved))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blueapps.middleware.xss.pxfilter import XssHtml
+from blueapps.middleware.xss.sanitizer import Sanitizer
+
+# 典型的富文本内容: 编辑器生成的文章、带表格的工单描述、包含注入尝试的评论
+PAYLOADS = [
+    (
+        '<h2 id="title" style="color: #333">故障复盘</h2>'
+        '<p class="lead">2020-05-01 10:00 <strong>核心交换机</strong>出现丢包, 影响范围见下表&nbsp;:</p>'
+        '<table border="1" cellpadding="4"><thead><tr><th>系统</th><th>影响</th></tr></thead>'
+        "<tbody><tr><td>CMDB</td><td>只读</td></tr><tr><td>作业平台</td><td>不可用</td></tr></tbody></table>"
+        '<p>处理过程参考 <a href="https://bk.tencent.com/docs/" title="文档">文档</a> 及'
+        ' <a href="wiki.example.com/ops" target="_self">内部wiki</a>。</p>'
+        '<ul><li>更换光模块</li><li>调整<em>LACP</em>配置</li></ul><img src="https://example.com/a.png" width="600" />'
+    )
+    * 4,
+    (
+        "<div><p>请执行以下命令:</p><pre><code>systemctl restart nginx &amp;&amp; tail -f /var/log/nginx/error.log"
+        "</code></pre><blockquote>注意: 只在<u>维护窗口</u>内操作</blockquote><hr/><p>联系人: <s>张三</s> 李四</p></div>"
+    )
+    * 8,
+    (
+        '<p onclick="alert(1)">hi<script>alert(document.cookie)</script></p>'
+        '<img src=x onerror=alert(1)><a href="javascript:alert(1)">click</a>'
+        '<div style="width: expression(alert(1))">x</div><iframe src="//evil"></iframe>'
+        '<embed src="movie.swf" type="application/x-shockwave-flash" allowscriptaccess="always" play="yes"/>'
+    )
+    * 4,
+]
+
+
+def xss_html(html):
+    # 当前过滤实现: 每次新建解析器
+    try:
+        parser = XssHtml()
+        parser.feed(html)
+        parser.close()
+        return parser.get_html()
+    except Exception:
+        return html
+
+
+class Command(BaseCommand):
+    help = u"富文本 XSS 过滤基准测试, 对比 XssHtml 与 Sanitizer 的耗时并校验输出一致"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=200, help="每轮执行次数")
+        parser.add_argument("--repeat", type=int, default=5, help="执行轮数")
+
+    def handle(self, **options):
+        number, repeat = options["number"], options["repeat"]
+        sanitizer = Sanitizer()
+
+        for payload in PAYLOADS:
+            if xss_html(payload) != sanitizer.sanitize(payload):
+                raise CommandError(u"过滤结果不一致: {}".format(payload[:100]))
+
+        cases = [
+            ("XssHtml per value", lambda: [xss_html(payload) for payload in PAYLOADS]),
+            ("Sanitizer.sanitize", lambda: [sanitizer.sanitize(payload) for payload in PAYLOADS]),
+            ("Sanitizer.sanitize_many", lambda: sanitizer.sanitize_many(PAYLOADS)),
+        ]
+        size = sum(len(payload) for payload in PAYLOADS)
+        self.stdout.write("{} payloads, {} chars per batch".format(len(PAYLOADS), size))
+        for name, func in cases:
+            best = min(timeit.repeat(func, number=number, repeat=repeat))
+            self.stdout.write("{:<30} {:>10.2f} us/batch".format(name, best / number * 1000000))
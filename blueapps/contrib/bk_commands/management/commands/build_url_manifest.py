@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from utils.url_manifest import MANIFEST_PATH, build_manifest, load_manifest, write_manifest
+
+
+class Command(BaseCommand):
+    help = u"扫描 apps/、apps_other/ 生成 app 路由清单(url_manifest.json)，供 urls.py 惰性挂载路由，建议在部署时执行"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=MANIFEST_PATH, help="清单文件路径")
+        parser.add_argument("--check", action="store_true", help="只检查现有清单是否可用，不写入")
+
+    def handle(self, **options):
+        if options["check"]:
+            entries = load_manifest(options["output"])
+            if entries is None:
+                self.stderr.write(u"清单不存在或已过期: {}".format(options["output"]))
+                raise SystemExit(1)
+            self.stdout.write(u"清单可用, 共 {} 个 app".format(len(entries)))
+            return
+
+        manifest = build_manifest()
+        write_manifest(manifest, options["output"])
+        for entry in manifest["apps"]:
+            self.stdout.write("{:<30} {:<50} {}".format(entry["prefix"], entry["module"], entry["app_name"] or ""))
+        self.stdout.write(u"已生成清单 {}, 共 {} 个 app".format(options["output"], len(manifest["apps"])))
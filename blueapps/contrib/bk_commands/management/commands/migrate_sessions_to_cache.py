@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from django.conf import settings
+from django.contrib.sessions.backends.cache import KEY_PREFIX
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "将数据库中未过期的 session 复制到缓存, 切换 SESSION_ENGINE 为 cache 前执行"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cache", default="session", help="目标缓存别名, 与切换后的 SESSION_CACHE_ALIAS 一致")
+        parser.add_argument("--batch-size", type=int, default=500, help="每批读取的 session 数量")
+        parser.add_argument("--dry-run", action="store_true", help="只统计不写入")
+
+    def handle(self, **options):
+        batch_size, dry_run = options["batch_size"], options["dry_run"]
+        if options["cache"] not in settings.CACHES:
+            raise CommandError("缓存别名 {} 未配置".format(options["cache"]))
+        cache = caches[options["cache"]]
+        now = timezone.now()
+
+        queryset = Session.objects.filter(expire_date__gt=now).order_by("pk")
+        total = copied = 0
+        last_key = ""
+        while True:
+            batch = list(queryset.filter(pk__gt=last_key)[:batch_size])
+            if not batch:
+                break
+            last_key = batch[-1].pk
+            total += len(batch)
+
+            for session in batch:
+                # 保持与数据库中一致的剩余有效期
+                timeout = int((session.expire_date - now).total_seconds())
+                if timeout <= 0:
+                    continue
+                if not dry_run:
+                    cache.set(KEY_PREFIX + session.session_key, session.get_decoded(), timeout)
+                copied += 1
+
+        self.stdout.write("live sessions: {}, copied: {}{}".format(total, copied, " (dry run)" if dry_run else ""))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = u"分析 web 进程启动(wsgi + ROOT_URLCONF)时各模块的导入耗时，输出累计耗时树"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-ms", type=float, default=1.0, help="只输出累计耗时不低于该值(毫秒)的模块")
+        parser.add_argument("--depth", type=int, default=4, help="输出的最大层级")
+        parser.add_argument("--top", type=int, default=30, help="按自身耗时排序输出的模块数")
+        parser.add_argument("--no-urls", action="store_true", help="不导入 ROOT_URLCONF")
+        parser.add_argument("--lazy", action="store_true", help="开启惰性导入模式(BKAPP_LAZY_IMPORTS=true)")
+        parser.add_argument("--compare", action="store_true", help="对比惰性导入模式开启前后的总耗时")
+
+    def handle(self, **options):
+        if options["compare"]:
+            default = self.profile(options, lazy=False)
+            lazy = self.profile(options, lazy=True)
+            self.stdout.write(
+                u"默认: {:.1f} ms, {} 个模块".format(default["cumulative"] * 1000, count_modules(default))
+            )
+            self.stdout.write(u"惰性导入: {:.1f} ms, {} 个模块".format(lazy["cumulative"] * 1000, count_modules(lazy)))
+            return
+
+        root = self.profile(options, lazy=options["lazy"])
+        self.stdout.write(u"累计耗时(ms)  自身耗时(ms)  模块")
+        self.write_tree(root, 0, options["depth"], options["min_ms"] / 1000)
+
+        self.stdout.write(u"\n自身耗时最高的 {} 个模块:".format(options["top"]))
+        nodes = sorted(iter_nodes(root), key=lambda node: node["self"], reverse=True)
+        for node in nodes[: options["top"]]:
+            self.stdout.write("{:>10.1f}  {}".format(node["self"] * 1000, node["name"]))
+        self.stdout.write(u"\n总耗时 {:.1f} ms, 共导入 {} 个模块".format(root["cumulative"] * 1000, count_modules(root)))
+
+    def profile(self, options, lazy):
+        """
+        在子进程中加载项目，避免当前进程已导入的模块影响统计
+        """
+        env = dict(os.environ, BKAPP_LAZY_IMPORTS="true" if lazy else "false")
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            command = [sys.executable, "-m", "blueapps.core.import_profiler", "--output", output.name]
+            if options["no_urls"]:
+                command.append("--no-urls")
+            process = subprocess.run(command, cwd=settings.BASE_DIR, env=env, stderr=subprocess.PIPE)
+            if process.returncode != 0:
+                raise CommandError(process.stderr.decode("utf-8", "replace"))
+            with open(output.name) as fp:
+                return json.load(fp)
+
+    def write_tree(self, node, level, max_depth, min_seconds):
+        for child in sorted(node["children"], key=lambda n: n["cumulative"], reverse=True):
+            if child["cumulative"] < min_seconds:
+                continue
+            self.stdout.write(
+                "{:>12.1f}  {:>12.1f}  {}{}".format(
+                    child["cumulative"] * 1000, child["self"] * 1000, "  " * level, child["name"]
+                )
+            )
+            if level + 1 < max_depth:
+                self.write_tree(child, level + 1, max_depth, min_seconds)
+
+
+def iter_nodes(node):
+    for child in node["children"]:
+        yield child
+        for descendant in iter_nodes(child):
+            yield descendant
+
+
+def count_modules(root):
+    return sum(1 for _ in iter_nodes(root))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+from blueapps.core.handler.wsgi import BkWSGIHandler
+
+
+def get_asgi_application():
+    """
+    The public interface to Django's ASGI support. Should return an ASGI 3
+    callable.
+
+    Django 3.0+ 使用原生的 ASGI handler，中间件及视图可以异步执行；
+    更早的版本没有 ASGI 支持，通过 asgiref 将 WSGI handler 适配为 ASGI 应用，请求在线程池中同步执行
+    """
+    django.setup(set_prefix=False)
+    if django.VERSION >= (3, 0):
+        from blueapps.core.handler.asgi import BkASGIHandler
+
+        return BkASGIHandler()
+
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError:
+        raise ImproperlyConfigured("Django %s has no ASGI support, please install asgiref" % django.get_version())
+    return WsgiToAsgi(BkWSGIHandler())
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+
+class LocalLRUCache(object):
+    """
+    进程内 LRU 缓存，每个条目带独立的过期时间
+    默认与 LocMemCache 一样保存 pickle 后的内容，每次读取返回新的对象，调用方修改读到的对象不会影响缓存及其他请求
+    只缓存不可变或不可 pickle 的对象(如已解析的公钥)时可设置 pickled=False，直接保存对象本身
+    """
+
+    def __init__(self, max_size, pickled=True):
+        self.max_size = max_size
+        self.pickled = pickled
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+        return pickle.loads(value) if self.pickled else value
+
+    def set(self, key, value, timeout):
+        if self.pickled:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.time() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheMetrics(threading.local):
+    """
+    线程内的缓存读取计数，由 CacheMetricsMiddleware 按请求重置
+    """
+
+    def __init__(self):
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+
+    def reset(self):
+        self.local_hits = self.remote_hits = self.misses = 0
+
+    @property
+    def hits(self):
+        return self.local_hits + self.remote_hits
+
+
+metrics = CacheMetrics()
+
+
+class ReadThroughCache(BaseCache):
+    """
+    在共享缓存(通常为 redis)之上增加短时间的进程内读缓存
+
+    CACHES = {
+        "login_db": {
+            "BACKEND": "blueapps.core.cache.backends.ReadThroughCache",
+            "LOCATION": "redis",  # 实际存储使用的 CACHES 别名
+            "KEY_PREFIX": "login",
+            "OPTIONS": {"LOCAL_TIMEOUT": 5, "LOCAL_MAX_ENTRIES": 1000},
+        }
+    }
+
+    进程内读缓存保存 pickle 后的内容，每次读取都返回新的对象，
+    cache session 等会原地修改读到的字典，不能在同一进程的并发请求间共享对象
+
+    写操作(包括 delete，如注销登录、删除 session)直接落到共享缓存，但只失效本进程的读缓存，
+    其他进程在 LOCAL_TIMEOUT 秒内仍可能读到旧值或已删除的值，
+    因此 LOCAL_TIMEOUT 只适合设置为很短的时间，不能接受该延迟的场景设置为 0 关闭进程内读缓存
+    """
+
+    def __init__(self, location, params):
+        super(ReadThroughCache, self).__init__(params)
+        options = params.get("OPTIONS", {})
+        self._alias = location
+        self._local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self._local = LocalLRUCache(options.get("LOCAL_MAX_ENTRIES", 1000))
+
+    @property
+    def remote(self):
+        return caches[self._alias]
+
+    def _key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _remote_timeout(self, timeout):
+        # 未指定时使用本缓存的默认超时时间，而不是被代理缓存的
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        if self._local_timeout:
+            value = self._local.get(key, _MISSING)
+            if value is not _MISSING:
+                metrics.local_hits += 1
+                return value
+
+        value = self.remote.get(key, _MISSING)
+        if value is _MISSING:
+            metrics.misses += 1
+            return default
+        metrics.remote_hits += 1
+        if self._local_timeout:
+            self._local.set(key, value, self._local_timeout)
+        return value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._local.delete(key)
+        return self.remote.add(key, value, self._remote_timeout(timeout))
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._local.delete(key)
+        self.remote.set(key, value, self._remote_timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.remote.touch(self._key(key, version), self._remote_timeout(timeout))
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        self._local.delete(key)
+        self.remote.delete(key)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        # 被代理的缓存可能同时被其他别名使用，这里只清理进程内读缓存
+        self._local.clear()
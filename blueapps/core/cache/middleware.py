@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import logging
+
+from django.db import connection
+from django.utils.deprecation import MiddlewareMixin
+
+from blueapps.core.cache.backends import metrics
+
+logger = logging.getLogger("blueapps")
+
+
+class QueryCounter(object):
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class CacheMetricsMiddleware(MiddlewareMixin):
+    """
+    统计每个请求的数据库查询次数，以及由 ReadThroughCache 承接的缓存读取次数
+    缓存命中的读取在使用 DatabaseCache 时各需要一次数据库查询，即为节省的查询次数
+
+    结果写入响应头 X-Cache-Metrics 并记录 debug 日志，建议放在 MIDDLEWARE 的最前面
+    """
+
+    def process_request(self, request):
+        metrics.reset()
+        request._query_counter = QueryCounter()
+        request._query_wrapper = connection.execute_wrapper(request._query_counter)
+        request._query_wrapper.__enter__()
+
+    def process_response(self, request, response):
+        counter = getattr(request, "_query_counter", None)
+        if counter is None:
+            return response
+        request._query_wrapper.__exit__(None, None, None)
+
+        response[
+            "X-Cache-Metrics"
+        ] = "db_queries={};cache_local_hits={};cache_remote_hits={};db_queries_saved={}".format(
+            counter.count, metrics.local_hits, metrics.remote_hits, metrics.hits
+        )
+        logger.debug(
+            "cache metrics, path->[%s] db_queries->[%s] db_queries_saved->[%s]",
+            request.path,
+            counter.count,
+            metrics.hits,
+        )
+        return response
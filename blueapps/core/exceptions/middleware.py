@@ -21,6 +21,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.utils.translation import gettext_lazy as _
 
 from blueapps.core.exceptions.base import BlueException
+from blueapps.core.log.utils import LazyString
 
 try:
     from raven.contrib.django.raven_compat.models import sentry_exception_handler
@@ -55,16 +56,15 @@ class AppExceptionMiddleware(MiddlewareMixin):
             return response
 
         # 用户未主动捕获的异常
+        # 堆栈及请求参数在日志实际输出时才格式化，被限流的日志不产生额外开销
         logger.error(
             u"""捕获未处理异常,异常具体堆栈->[%s], 请求URL->[%s], """
-            u"""请求用户->[%s] 请求方法->[%s] 请求参数->[%s]"""
-            % (
-                traceback.format_exc(),
-                request.path,
-                request.user.username,
-                request.method,
-                json.dumps(getattr(request, request.method, None)),
-            )
+            u"""请求用户->[%s] 请求方法->[%s] 请求参数->[%s]""",
+            LazyString(traceback.format_exc),
+            request.path,
+            request.user.username,
+            request.method,
+            LazyString(json.dumps, getattr(request, request.method, None)),
         )
 
         # 对于check开头函数进行遍历调用，如有满足条件的函数，则不屏蔽异常
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from django.core.handlers.asgi import ASGIHandler
+
+from blueapps.core.handler.wsgi import apply_script_name
+
+
+class BkASGIHandler(ASGIHandler):
+    """
+    需要 Django 3.0+
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope.get("headers") or []:
+                if name == b"x-script-name":
+                    scope = dict(scope, root_path=apply_script_name(value.decode("latin1")))
+                    break
+        return await super(BkASGIHandler, self).__call__(scope, receive, send)
@@ -15,17 +15,25 @@ from django.conf import settings
 from django.core.handlers.wsgi import WSGIHandler
 
 
+def apply_script_name(script_name):
+    """
+    根据 X-Script-Name 请求头调整 SITE_URL 等配置
+    @return: 规范化后的 script_name
+    """
+    if script_name == "/":
+        # '/'的含义：独立域名，不启用script_name
+        script_name = ""
+    settings.FORCE_SCRIPT_NAME = settings.SITE_URL = "%s/" % script_name
+
+    # 如果没有独立域名的配置，需要不断的适配，否则可以直接使用
+    if not settings.STATIC_URL.startswith("http"):
+        settings.STATIC_URL = "%sstatic/" % settings.SITE_URL
+    return script_name
+
+
 class BkWSGIHandler(WSGIHandler):
     def __call__(self, environ, start_response):
         script_name = environ.get("HTTP_X_SCRIPT_NAME")
         if script_name is not None:
-            if script_name == "/":
-                # '/'的含义：独立域名，不启用script_name
-                script_name = ""
-            environ["SCRIPT_NAME"] = script_name
-            settings.FORCE_SCRIPT_NAME = settings.SITE_URL = "%s/" % script_name
-
-            # 如果没有独立域名的配置，需要不断的适配，否则可以直接使用
-            if not settings.STATIC_URL.startswith("http"):
-                settings.STATIC_URL = "%sstatic/" % settings.SITE_URL
+            environ["SCRIPT_NAME"] = apply_script_name(script_name)
         return super(BkWSGIHandler, self).__call__(environ, start_response)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import time
+
+"""
+导入耗时分析
+
+通过替换 importlib._bootstrap._find_and_load 记录每个模块的导入耗时(与 python -X importtime 的统计口径一致，
+Python 3.6 不支持 -X importtime)，生成按导入关系组织的耗时树
+
+python -m blueapps.core.import_profiler --output /tmp/imports.json
+"""
+
+
+class ImportNode(object):
+    __slots__ = ("name", "cumulative", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.cumulative = 0.0
+        self.children = []
+
+    @property
+    def self_time(self):
+        return self.cumulative - sum(child.cumulative for child in self.children)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "cumulative": self.cumulative,
+            "self": self.self_time,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+class ImportProfiler(object):
+    def __init__(self):
+        self.root = ImportNode("<root>")
+        self._stack = [self.root]
+        self._original = None
+
+    def install(self):
+        bootstrap = importlib._bootstrap
+        self._original = original = bootstrap._find_and_load
+        stack = self._stack
+
+        def _find_and_load(name, import_):
+            node = ImportNode(name)
+            stack[-1].children.append(node)
+            stack.append(node)
+            started = time.perf_counter()
+            try:
+                return original(name, import_)
+            finally:
+                node.cumulative = time.perf_counter() - started
+                stack.pop()
+
+        bootstrap._find_and_load = _find_and_load
+
+    def uninstall(self):
+        if self._original is not None:
+            importlib._bootstrap._find_and_load = self._original
+            self._original = None
+
+    def run(self, func):
+        self.install()
+        started = time.perf_counter()
+        try:
+            func()
+        finally:
+            self.root.cumulative = time.perf_counter() - started
+            self.uninstall()
+        return self.root
+
+
+def load_project(urls=True):
+    """
+    模拟 web 进程启动: 加载 wsgi 应用，可选导入 ROOT_URLCONF(首个请求时才会导入)
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    importlib.import_module("wsgi")
+    if urls:
+        from django.conf import settings
+
+        importlib.import_module(settings.ROOT_URLCONF)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", required=True, help="耗时树 JSON 输出路径")
+    parser.add_argument("--no-urls", action="store_true", help="不导入 ROOT_URLCONF")
+    args = parser.parse_args(argv)
+
+    root = ImportProfiler().run(lambda: load_project(urls=not args.no_urls))
+    with open(args.output, "w") as fp:
+        json.dump(root.as_dict(), fp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import importlib
+import os
+import threading
+import types
+
+"""
+惰性导入工具
+
+开启 BKAPP_LAZY_IMPORTS=true 后，web 进程不加载不需要的可选子系统(如 swagger)
+celery 不做惰性处理: djcelery 在 INSTALLED_APPS 中(utils.celery_service 使用其模型)，django.setup() 时总会导入 celery
+"""
+
+
+def lazy_imports_enabled():
+    # settings 加载前即需要判断，只能通过环境变量开启
+    return os.environ.get("BKAPP_LAZY_IMPORTS", "false").lower() == "true"
+
+
+class LazyModule(types.ModuleType):
+    """
+    首次访问属性时才导入的模块代理
+
+    AES = LazyModule("Crypto.Cipher.AES")
+    AES.new(...)  # 此时才导入 Crypto.Cipher.AES
+    """
+
+    def __init__(self, name):
+        super(LazyModule, self).__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
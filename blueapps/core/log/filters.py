@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import logging
+import random
+import threading
+import weakref
+
+# 已创建的过滤器，用于汇总被抑制的日志数量
+_registry = weakref.WeakSet()
+
+
+def get_filter_stats():
+    """
+    @return: {过滤器名称: {计数项: 数量}}
+    """
+    result = {}
+    for log_filter in list(_registry):
+        stats = result.setdefault(log_filter.name or log_filter.__class__.__name__, {})
+        for key, value in log_filter.stats().items():
+            stats[key] = stats.get(key, 0) + value
+    return result
+
+
+class CountingFilter(logging.Filter):
+    def __init__(self, name=""):
+        super(CountingFilter, self).__init__(name)
+        self.suppressed = 0
+        _registry.add(self)
+
+    def stats(self):
+        return {"suppressed": self.suppressed}
+
+
+class RateLimitFilter(CountingFilter):
+    """
+    按日志调用位置(logger + 文件 + 行号)限流，每个调用位置在 period 秒内最多输出 limit 条
+    窗口内被丢弃的数量会附加在下一个窗口的第一条日志后面
+    """
+
+    def __init__(self, limit=20, period=60, name=""):
+        super(RateLimitFilter, self).__init__(name)
+        self.limit = limit
+        self.period = period
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.pathname, record.lineno)
+        window = int(record.created // self.period)
+        with self._lock:
+            current, count, suppressed = self._windows.get(key, (window, 0, 0))
+            if current != window:
+                current, count = window, 0
+            if count >= self.limit:
+                self._windows[key] = (current, count, suppressed + 1)
+                self.suppressed += 1
+                return False
+            self._windows[key] = (current, count + 1, 0)
+
+        if suppressed and not isinstance(record.msg, dict):
+            record.msg = "%s [suppressed %d similar messages]" % (record.getMessage(), suppressed)
+            record.args = None
+        return True
+
+
+class SamplingFilter(CountingFilter):
+    """
+    按比例抽样 level 及以下级别的日志，更高级别的日志全部保留
+    """
+
+    def __init__(self, rate=1.0, level=logging.INFO, name=""):
+        super(SamplingFilter, self).__init__(name)
+        self.rate = rate
+        self.level = logging._checkLevel(level)
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > self.level:
+            return True
+        if random.random() < self.rate:
+            return True
+        self.suppressed += 1
+        return False
+
+
+class TruncateFilter(CountingFilter):
+    """
+    截断超过 max_length 的日志内容(如组件返回的响应体、请求参数及异常堆栈)
+    """
+
+    def __init__(self, max_length=10240, name=""):
+        super(TruncateFilter, self).__init__(name)
+        self.max_length = max_length
+        self.truncated = 0
+
+    def stats(self):
+        return {"truncated": self.truncated}
+
+    def filter(self, record):
+        if isinstance(record.msg, dict):
+            return True
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = "%s...[truncated %d chars]" % (message[: self.max_length], len(message) - self.max_length)
+            record.args = None
+            self.truncated += 1
+        return True
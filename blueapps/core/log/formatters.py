@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import datetime
+import json
+import logging
+import re
+import time
+import traceback
+from inspect import istraceback
+
+# LogRecord 的内置属性，不作为 extra 字段输出
+RESERVED_ATTRS = frozenset(
+    (
+        "args",
+        "asctime",
+        "created",
+        "exc_info",
+        "exc_text",
+        "filename",
+        "funcName",
+        "levelname",
+        "levelno",
+        "lineno",
+        "module",
+        "msecs",
+        "message",
+        "msg",
+        "name",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "stack_info",
+        "thread",
+        "threadName",
+    )
+)
+
+FIELD_RE = re.compile(r"\((.+?)\)")
+
+
+def json_default(obj):
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif istraceback(obj):
+        return "".join(traceback.format_tb(obj)).strip()
+    elif isinstance(obj, Exception):
+        return "Exception: %s" % str(obj)
+    return str(obj)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    与 pythonjsonlogger.jsonlogger.JsonFormatter 输出一致的 JSON 格式化器，减少每条日志的格式化开销
+    - fmt 中的字段及需要跳过的字段在初始化时解析
+    - 复用同一个 JSONEncoder
+    - asctime 按秒缓存，同一秒内的日志只调用一次 strftime
+    - 异常堆栈格式化结果缓存在 record.exc_text 上，多个 handler 输出同一条日志时只格式化一次
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style="%", prefix=""):
+        super(JsonFormatter, self).__init__(fmt, datefmt, style)
+        self.prefix = prefix
+        self.fields = tuple(FIELD_RE.findall(self._fmt))
+        self.skip_fields = RESERVED_ATTRS.union(self.fields)
+        self.use_asctime = "asctime" in self.fields
+        self.encoder = json.JSONEncoder(default=json_default)
+        self._time_cache = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super(JsonFormatter, self).formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if cached_second != second:
+            cached_text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._time_cache = (second, cached_text)
+        return self.default_msec_format % (cached_text, record.msecs)
+
+    def format(self, record):
+        message_dict = {}
+        if isinstance(record.msg, dict):
+            message_dict = record.msg
+            record.message = None
+        else:
+            record.message = record.getMessage()
+        if self.use_asctime:
+            record.asctime = self.formatTime(record, self.datefmt)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text and not message_dict.get("exc_info"):
+            message_dict["exc_info"] = record.exc_text
+
+        record_dict = record.__dict__
+        log_record = {field: record_dict.get(field) for field in self.fields}
+        log_record.update(message_dict)
+        skip_fields = self.skip_fields
+        for key, value in record_dict.items():
+            if key not in skip_fields and not (isinstance(key, str) and key.startswith("_")):
+                log_record[key] = value
+
+        return self.prefix + self.encoder.encode(log_record)
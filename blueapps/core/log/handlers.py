@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+
+from django.utils.module_loading import import_string
+
+OVERFLOW_DROP = "drop"
+OVERFLOW_BLOCK = "block"
+
+# 队列满且策略为 block 时最长等待时间, 单位秒, 超时仍丢弃
+BLOCK_TIMEOUT = 1
+
+
+class LogDispatcher(object):
+    """
+    进程内共享的日志队列及后台写入线程
+    业务线程只负责将 (handler, record) 放入有界队列，格式化、写文件及文件轮转均在后台线程完成
+
+    队列满时按 overflow 策略处理:
+    - drop: 直接丢弃新日志(默认)，不阻塞业务线程
+    - block: 等待队列空位，最多 BLOCK_TIMEOUT 秒
+    """
+
+    def __init__(self, maxsize=10000, overflow=OVERFLOW_DROP):
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def stats(self):
+        return {
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "errors": self.errors,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def ensure_started(self):
+        # fork 后子进程中没有父进程的后台线程，按进程号重新创建
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.maxsize)
+            self._thread = threading.Thread(target=self._run, name="blueapps-log-dispatcher", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def put(self, handler, record):
+        self.ensure_started()
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self._queue.put((handler, record), timeout=BLOCK_TIMEOUT)
+            else:
+                self._queue.put_nowait((handler, record))
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.enqueued += 1
+
+    def _run(self):
+        q = self._queue
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            handler, record = item
+            try:
+                handler.handle_target(record)
+                self.written += 1
+            except Exception:
+                self.errors += 1
+            finally:
+                q.task_done()
+        q.task_done()
+
+    def flush(self):
+        """
+        等待队列中已有的日志写入完成
+        """
+        if self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self):
+        if self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=BLOCK_TIMEOUT)
+            self._thread.join(BLOCK_TIMEOUT * 5)
+        except queue.Full:
+            sys.stderr.write("blueapps log dispatcher queue is full when exiting, pending logs are discarded\n")
+        self._pid = None
+
+
+dispatcher = LogDispatcher()
+
+
+def configure_dispatcher(maxsize=None, overflow=None):
+    """
+    在日志队列启动前调整队列长度及溢出策略
+    """
+    if maxsize is not None:
+        dispatcher.maxsize = maxsize
+    if overflow is not None:
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError("invalid log queue overflow policy: %s" % overflow)
+        dispatcher.overflow = overflow
+
+
+class QueuedHandler(logging.Handler):
+    """
+    异步写入的 handler，包装一个实际写入的 handler，参数 handler 为其 dictConfig 配置
+
+    "root": {
+        "()": "blueapps.core.log.handlers.QueuedHandler",
+        "handler": {"class": "logging.handlers.RotatingFileHandler", "filename": "...", "maxBytes": 1024},
+        "formatter": "verbose",
+    }
+
+    level/formatter/filters 配置在外层 handler 上，级别与过滤在业务线程中判断，格式化在后台线程中进行
+    """
+
+    def __init__(self, handler, queue_size=None, overflow=None):
+        super(QueuedHandler, self).__init__()
+        handler = dict(handler)
+        handler_class = handler.pop("class")
+        if isinstance(handler_class, str):
+            handler_class = import_string(handler_class)
+        self.target = handler_class(**handler)
+        configure_dispatcher(queue_size, overflow)
+
+    def setFormatter(self, fmt):
+        super(QueuedHandler, self).setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # 参数可能在入队后被业务代码修改，在当前线程合并 message，格式化留给后台线程
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def emit(self, record):
+        try:
+            dispatcher.put(self, self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def handle_target(self, record):
+        self.target.handle(record)
+
+    def flush(self):
+        dispatcher.flush()
+        self.target.flush()
+
+    def close(self):
+        self.target.close()
+        super(QueuedHandler, self).close()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import asyncio
+
+
+def mark_coroutine(obj):
+    """
+    将可调用对象标记为协程函数，使 Django 的 ASGI handler 以异步方式调用
+    """
+    try:
+        from asgiref.sync import markcoroutinefunction
+    except ImportError:
+        # asgiref < 3.6
+        obj._is_coroutine = asyncio.coroutines._is_coroutine
+    else:
+        markcoroutinefunction(obj)
+
+
+class DualModeMiddleware(object):
+    """
+    同时支持同步(WSGI)与异步(ASGI)调用链的中间件基类
+    子类实现 call(request) 及 acall(request)，根据 get_response 是否为协程函数自动选择
+
+    未继承 MiddlewareMixin 的中间件使用此基类，继承 MiddlewareMixin 的中间件在 Django 3.1+ 上已自动支持两种模式
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            mark_coroutine(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.call(request)
+
+    def call(self, request):
+        return self.get_response(request)
+
+    async def acall(self, request):
+        return await self.get_response(request)
@@ -13,15 +13,16 @@ specific language governing permissions and limitations under the License.
 
 from __future__ import unicode_literals
 
+import asyncio
+
 from django.conf import settings
 from django.urls import resolve
 
+from blueapps.middleware.base import DualModeMiddleware
 
-class BkuiPageMiddleware(object):
-    def __init__(self, get_response):
-        self.get_response = get_response
 
-    def __call__(self, request):
+class BkuiPageMiddleware(DualModeMiddleware):
+    def call(self, request):
         response = self.get_response(request)
 
         # 判断是否发生404的问题，及BKUI的
@@ -30,3 +31,16 @@ class BkuiPageMiddleware(object):
             return home_view_func.func(request)
 
         return response
+
+    async def acall(self, request):
+        from asgiref.sync import sync_to_async
+
+        response = await self.get_response(request)
+
+        if response.status_code == 404 and settings.IS_BKUI_HISTORY_MODE:
+            home_view_func = resolve("/")
+            if asyncio.iscoroutinefunction(home_view_func.func):
+                return await home_view_func.func(request)
+            return await sync_to_async(home_view_func.func)(request)
+
+        return response
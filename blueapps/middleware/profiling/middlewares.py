@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from blueapps.middleware.base import DualModeMiddleware
+from blueapps.middleware.profiling.profile import (
+    PROFILE_ATTR,
+    RequestProfile,
+    SqlTimer,
+    instrument_templates,
+    record_component_call,
+)
+from blueking.component.base import ComponentAPI
+
+logger = logging.getLogger("performance")
+
+DEEP_PROFILE_ATTR = "_bk_deep_profile"
+
+# 深度分析结果的输出方式
+DEEP_PROFILE_RESPONSE = "response"
+DEEP_PROFILE_LOG = "log"
+
+
+class DeepProfile(object):
+    """
+    单个请求的 cProfile 深度分析，可在请求进入时(抽样)或 process_view 中(请求头触发)开启
+    """
+
+    def __init__(self, mode=None):
+        self.mode = mode
+        self.profiler = None
+
+    def start(self, mode=None):
+        if mode is not None:
+            self.mode = mode
+        if self.mode is None or self.profiler is not None:
+            return
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+
+class ProfilingMiddleware(DualModeMiddleware):
+    """
+    请求性能统计
+    - 每个请求统计 SQL、ESB 调用、缓存读取及模板渲染的次数与耗时，记录 performance 日志，超级管理员的响应带 Server-Timing 头
+    - 超级管理员的请求携带 X-Bk-Profile 头时，使用 cProfile 分析视图及之后的处理，并以纯文本替换原响应返回
+    - 按 BK_PROFILING_SAMPLE_RATE 比例抽样深度分析整个请求，结果只记录日志
+
+    请放在 session 及登录中间件之前，以统计其中的 SQL 与缓存读取；
+    请求头触发的深度分析在 process_view 中开启，此时 AuthenticationMiddleware 已根据 session 设置 request.user，
+    非超级管理员(包括匿名用户)携带请求头不会开启 cProfile
+    """
+
+    def __init__(self, get_response):
+        super(ProfilingMiddleware, self).__init__(get_response)
+        ComponentAPI.add_call_listener(record_component_call)
+        instrument_templates()
+
+    def call(self, request):
+        profile = RequestProfile()
+        setattr(request, PROFILE_ATTR, profile)
+        deep_profile = DeepProfile(self.get_sample_mode())
+        setattr(request, DEEP_PROFILE_ATTR, deep_profile)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(SqlTimer(profile)))
+            stack.callback(deep_profile.stop)
+            deep_profile.start()
+            response = self.get_response(request)
+
+        profile.finish()
+        if deep_profile.mode is not None:
+            report = self.format_stats(deep_profile.profiler)
+            if deep_profile.mode == DEEP_PROFILE_RESPONSE:
+                response = HttpResponse(report, content_type="text/plain; charset=utf-8")
+            else:
+                logger.info("deep profile, method->[%s] path->[%s]\n%s", request.method, request.path, report)
+        return self.emit(request, response, profile)
+
+    def process_view(self, request, view, args, kwargs):
+        deep_profile = getattr(request, DEEP_PROFILE_ATTR, None)
+        if deep_profile is not None and settings.BK_PROFILING_HEADER in request.META and self.is_superuser(request):
+            deep_profile.start(DEEP_PROFILE_RESPONSE)
+        return None
+
+    async def acall(self, request):
+        # 异步调用链中视图可能在其他线程执行，不做 cProfile 深度分析
+        profile = RequestProfile()
+        setattr(request, PROFILE_ATTR, profile)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(SqlTimer(profile)))
+            response = await self.get_response(request)
+        profile.finish()
+        return self.emit(request, response, profile)
+
+    @staticmethod
+    def get_sample_mode():
+        if settings.BK_PROFILING_SAMPLE_RATE and random.random() < settings.BK_PROFILING_SAMPLE_RATE:
+            return DEEP_PROFILE_LOG
+        return None
+
+    @staticmethod
+    def is_superuser(request):
+        user = getattr(request, "user", None)
+        return user is not None and user.is_authenticated and user.is_superuser
+
+    @staticmethod
+    def format_stats(profiler):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(settings.BK_PROFILING_TOP_N)
+        return stream.getvalue()
+
+    @classmethod
+    def emit(cls, request, response, profile):
+        # Server-Timing 暴露 SQL、ESB 等内部耗时，只返回给超级管理员
+        if cls.is_superuser(request):
+            response["Server-Timing"] = profile.server_timing()
+        logger.info(
+            "request profile, method->[%s] path->[%s] status->[%s]",
+            request.method,
+            request.path,
+            response.status_code,
+            extra={"profile": profile.as_dict()},
+        )
+        return response
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+
+from blueapps.core.cache.backends import metrics as cache_metrics
+from blueapps.utils.request_context import get_current_request
+
+PROFILE_ATTR = "_blueapps_profile"
+
+
+class RequestProfile(object):
+    """
+    单个请求的耗时统计，保存在请求对象上，通过 get_current_profile 获取
+    - SQL: 查询次数及总耗时
+    - ESB: 按 collection 统计调用次数及总耗时
+    - 缓存: ReadThroughCache 的命中(进程内/共享)及未命中次数
+    - 模板: 渲染次数及总耗时(嵌套的 include/extends 只统计最外层)
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.duration = None
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.esb = {}
+        self.template_count = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self._cache_start = (cache_metrics.local_hits, cache_metrics.remote_hits, cache_metrics.misses)
+        self._cache_end = None
+        self._lock = threading.Lock()
+
+    def record_sql(self, duration):
+        self.sql_count += 1
+        self.sql_time += duration
+
+    def record_esb(self, collection, duration):
+        # ESB 调用可能在线程池中并发执行
+        with self._lock:
+            count, total = self.esb.get(collection, (0, 0.0))
+            self.esb[collection] = (count + 1, total + duration)
+
+    def record_template(self, duration):
+        self.template_count += 1
+        self.template_time += duration
+
+    def finish(self):
+        self.duration = time.time() - self.started
+        self._cache_end = (cache_metrics.local_hits, cache_metrics.remote_hits, cache_metrics.misses)
+
+    @property
+    def cache(self):
+        end = self._cache_end or (cache_metrics.local_hits, cache_metrics.remote_hits, cache_metrics.misses)
+        local_hits, remote_hits, misses = [e - s for s, e in zip(self._cache_start, end)]
+        return {"local_hits": local_hits, "remote_hits": remote_hits, "misses": misses}
+
+    def as_dict(self):
+        return {
+            "duration": ms(self.duration),
+            "sql": {"count": self.sql_count, "duration": ms(self.sql_time)},
+            "esb": {
+                collection: {"count": count, "duration": ms(total)}
+                for collection, (count, total) in sorted(self.esb.items())
+            },
+            "cache": self.cache,
+            "template": {"count": self.template_count, "duration": ms(self.template_time)},
+        }
+
+    def server_timing(self):
+        """
+        @return: Server-Timing 响应头的值，耗时单位为毫秒
+        """
+        metrics = ['sql;dur={};desc="{} queries"'.format(ms(self.sql_time), self.sql_count)]
+        for collection, (count, total) in sorted(self.esb.items()):
+            metrics.append('esb-{};dur={};desc="{} calls"'.format(collection, ms(total), count))
+        cache = self.cache
+        metrics.append(
+            'cache;desc="hit={} miss={}"'.format(cache["local_hits"] + cache["remote_hits"], cache["misses"])
+        )
+        if self.template_count:
+            metrics.append('tpl;dur={};desc="{} templates"'.format(ms(self.template_time), self.template_count))
+        if self.duration is not None:
+            metrics.append("total;dur={}".format(ms(self.duration)))
+        return ", ".join(metrics)
+
+
+def ms(seconds):
+    return round((seconds or 0) * 1000, 2)
+
+
+def get_current_profile():
+    """
+    @return: 当前请求的 RequestProfile，未开启性能统计时返回 None
+    """
+    return getattr(get_current_request(), PROFILE_ATTR, None)
+
+
+class SqlTimer(object):
+    """
+    connection.execute_wrapper 使用的 SQL 计时器
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.time()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.profile.record_sql(time.time() - started)
+
+
+def record_component_call(api, duration):
+    """
+    ESB 组件调用完成后的回调，见 ComponentAPI.add_call_listener
+    """
+    profile = get_current_profile()
+    if profile is not None:
+        profile.record_esb(api.collection or "unknown", duration)
+
+
+_template_patch_lock = threading.Lock()
+
+
+def instrument_templates():
+    """
+    为 Django 模板渲染增加计时，与 django.test.utils.setup_test_environment 的做法一致，只生效一次
+    """
+    from django.template.base import Template
+
+    with _template_patch_lock:
+        if getattr(Template._render, "_blueapps_profiled", False):
+            return
+        original_render = Template._render
+
+        def profiled_render(self, context):
+            profile = get_current_profile()
+            if profile is None:
+                return original_render(self, context)
+            profile.template_depth += 1
+            started = time.time()
+            try:
+                return original_render(self, context)
+            finally:
+                profile.template_depth -= 1
+                if profile.template_depth == 0:
+                    profile.record_template(time.time() - started)
+
+        profiled_render._blueapps_profiled = True
+        Template._render = profiled_render
@@ -11,14 +11,12 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import logging
-import re
 
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
-from .utils import check_script, html_escape, html_escape_name, url_escape
+from .escaper import XssEscaper
 
 SITE_URL = settings.SITE_URL
 logger = logging.getLogger("app")
@@ -26,7 +24,8 @@ logger = logging.getLogger("app")
 
 class CheckXssMiddleware(MiddlewareMixin):
     def __init__(self, *args, **kwargs):
-        self.__escape_param_list = []
+        use_name, use_url, use_script = self.__filter_path_list()
+        self.escaper = XssEscaper(use_name, use_url, use_script)
         super(CheckXssMiddleware, self).__init__(*args, **kwargs)
 
     def process_view(self, request, view, args, kwargs):
@@ -36,7 +35,7 @@ class CheckXssMiddleware(MiddlewareMixin):
                 return None
 
             # 获取豁免参数名
-            self.__escape_param_list = (
+            escape_param_list = (
                 getattr(view, "escape_exempt_param", []) if getattr(view, "escape_exempt_param", False) else []
             )
 
@@ -46,93 +45,22 @@ class CheckXssMiddleware(MiddlewareMixin):
             elif getattr(view, "escape_url", False):
                 escape_type = "url"
             # get参数转换
-            request.GET = self.__escape_data(request.path, request.GET, escape_type)
+            request.GET = self.__escape_data(request.path, request.GET, escape_type, escape_param_list)
             # post参数转换
-            request.POST = self.__escape_data(request.path, request.POST, escape_type)
+            request.POST = self.__escape_data(request.path, request.POST, escape_type, escape_param_list)
         except Exception as e:
             logger.error(u"CheckXssMiddleware 转换失败！%s" % e)
         return None
 
-    def __escape_data(self, path, query_dict, escape_type=None):
-        """
-        GET/POST参数转义
-        """
-        data_copy = query_dict.copy()
-        for _get_key, _get_value_list in data_copy.lists():
-            new_value_list = []
-            for _get_value in _get_value_list:
-                new_value = _get_value
-                # json串不进行转义
-                try:
-                    json.loads(_get_value)
-                    is_json = True
-                except (TypeError, ValueError):
-                    is_json = False
-                # 转义新数据
-                if not is_json:
-                    try:
-                        if escape_type is None:
-                            use_type = self.__filter_param(path, _get_key)
-                        else:
-                            use_type = escape_type
-
-                        if use_type == "url":
-                            new_value = url_escape(_get_value)
-                        elif use_type == "script":
-                            new_value = check_script(_get_value)
-                        elif use_type == "name":
-                            new_value = html_escape_name(_get_value)
-                        elif _get_key in self.__escape_param_list:
-                            new_value = _get_value
-                        else:
-                            new_value = html_escape(_get_value, 1)
-                    except Exception as e:
-                        logger.error(u"CheckXssMiddleware GET/POST参数 转换失败！%s" % e)
-                        new_value = _get_value
-                else:
-                    try:
-                        new_value = html_escape(_get_value, 1, True)
-                    except Exception as e:
-                        logger.error(u"CheckXssMiddleware GET/POST参数 转换失败！%s" % e)
-                        new_value = _get_value
-                new_value_list.append(new_value)
-            data_copy.setlist(_get_key, new_value_list)
-        return data_copy
-
-    def __filter_param(self, path, param):
+    def __escape_data(self, path, query_dict, escape_type=None, escape_param_list=()):
         """
-        特殊path处理
-        @param path: 路径
-        @param param: 参数
-        @return: 'html/name/url/script/exempt'
+        GET/POST参数转义，没有需要转义的参数时返回原QueryDict
         """
-        use_name, use_url, use_script = self.__filter_path_list()
         try:
-            result = "html"
-            # name过滤
-            for name_path, name_v in use_name.items():
-                is_path = re.match(r"^%s" % name_path, path)
-                if is_path and param in name_v:
-                    result = "name"
-                    break
-            # url过滤
-            if result == "html":
-                for url_path, url_v in use_url.items():
-                    is_path = re.match(r"^%s" % url_path, path)
-                    if is_path and param in url_v:
-                        result = "url"
-                        break
-            # script过滤
-            if result == "html":
-                for script_path, script_v in use_script.items():
-                    is_path = re.match(r"^%s" % script_path, path)
-                    if is_path and param in script_v:
-                        result = "script"
-                        break
+            return self.escaper.escape_query_dict(path, query_dict, escape_type, frozenset(escape_param_list))
         except Exception as e:
-            logger.error(u"CheckXssMiddleware 特殊path处理失败！%s" % e)
-            result = "html"
-        return result
+            logger.error(u"CheckXssMiddleware GET/POST参数 转换失败！%s" % e)
+            return query_dict
 
     def __filter_path_list(self):
         """
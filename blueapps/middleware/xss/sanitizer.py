@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import re
+import threading
+
+from six.moves.html_parser import HTMLParser
+
+from .pxfilter import XssHtml
+
+"""
+富文本 XSS 过滤引擎，过滤规则及输出与 pxfilter.XssHtml 一致
+
+- 标签/属性白名单、url 及 style 的正则在初始化时预编译
+- 解析器实例放在池中复用，避免每次过滤都新建 HTMLParser
+- 不包含标签及实体的纯文本直接转义，不经过解析器
+- sanitize_many 批量过滤时只占用一个解析器
+
+from blueapps.middleware.xss.sanitizer import sanitizer
+sanitizer.sanitize('<p onclick="alert(1)">hello</p>')
+=> '<p>hello</p>'
+"""
+
+URL_RE = re.compile(r"^(http|https|ftp)://.+", re.I | re.S)
+STYLE_ESCAPE_RE = re.compile(r"(\\|&#|/\*|\*/)")
+STYLE_EXPRESSION_RE = re.compile(r"e.*x.*p.*r.*e.*s.*s.*i.*o.*n")
+
+HTML_SPECIAL_CHARS_TABLE = str.maketrans({"<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#039;"})
+
+A_LIMIT = {"target": frozenset(["_blank", "_self"])}
+EMBED_LIMIT = {
+    "type": frozenset(["application/x-shockwave-flash"]),
+    "wmode": frozenset(["transparent", "window", "opaque"]),
+    "play": frozenset(["true", "false"]),
+    "loop": frozenset(["true", "false"]),
+    "menu": frozenset(["true", "false"]),
+    "allowfullscreen": frozenset(["true", "false"]),
+}
+
+
+def htmlspecialchars(html):
+    return html.translate(HTML_SPECIAL_CHARS_TABLE)
+
+
+def true_url(url):
+    if URL_RE.match(url):
+        return url
+    return "http://%s" % url
+
+
+def true_style(style):
+    if style:
+        style = STYLE_ESCAPE_RE.sub("_", style)
+        style = STYLE_EXPRESSION_RE.sub("_", style)
+    return style
+
+
+def limit_attr(attrs, limit):
+    for key, values in limit.items():
+        if key in attrs and attrs[key] not in values:
+            del attrs[key]
+
+
+class SanitizeRules(object):
+    """
+    预编译的过滤规则
+    """
+
+    def __init__(self, allow_tags=None):
+        self.allow_tags = frozenset(allow_tags or XssHtml.allow_tags)
+        self.nonend_tags = frozenset(XssHtml.nonend_tags)
+        common_attrs = frozenset(XssHtml.common_attrs)
+        self.default_attrs = common_attrs
+        self.tag_attrs = {tag: common_attrs | frozenset(own) for tag, own in XssHtml.tags_own_attrs.items()}
+
+
+class SanitizeParser(HTMLParser):
+    """
+    可复用的解析器，每次使用前调用 reset
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.result = []
+        self.start = []
+        HTMLParser.__init__(self)
+
+    def reset(self):
+        HTMLParser.reset(self)
+        self.result = []
+        self.start = []
+
+    def sanitize(self, html):
+        self.reset()
+        self.feed(html)
+        self.close()
+        return self.get_html()
+
+    def get_html(self):
+        data = []
+        for item in self.result:
+            item = item.rstrip("\n").lstrip("\n")
+            if item:
+                data.append(item)
+        return "".join(data)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_starttag(self, tag, attrs):
+        rules = self.rules
+        if tag not in rules.allow_tags:
+            return
+        is_nonend = tag in rules.nonend_tags
+        if not is_nonend:
+            self.start.append(tag)
+
+        allowed_attrs = rules.tag_attrs.get(tag, rules.default_attrs)
+        attdict = {}
+        for key, value in attrs:
+            attdict[key] = value
+        for key in list(attdict):
+            if key not in allowed_attrs:
+                del attdict[key]
+
+        if "style" in attdict:
+            attdict["style"] = true_style(attdict["style"])
+        if tag == "a":
+            if "href" in attdict:
+                attdict["href"] = true_url(attdict["href"])
+            if "target" not in attdict:
+                attdict["target"] = "_blank"
+            limit_attr(attdict, A_LIMIT)
+        elif tag == "embed":
+            if "src" in attdict:
+                attdict["src"] = true_url(attdict["src"])
+            limit_attr(attdict, EMBED_LIMIT)
+            attdict["allowscriptaccess"] = "never"
+            attdict["allownetworking"] = "none"
+
+        if attdict:
+            attrs = " " + " ".join('{}="{}"'.format(key, htmlspecialchars(value)) for key, value in attdict.items())
+        else:
+            attrs = ""
+        self.result.append("<" + tag + attrs + (" /" if is_nonend else "") + ">")
+
+    def handle_endtag(self, tag):
+        if self.start and tag == self.start[-1]:
+            self.result.append("</" + tag + ">")
+            self.start.pop()
+
+    def handle_data(self, data):
+        self.result.append(htmlspecialchars(data))
+
+    def handle_entityref(self, name):
+        if name.isalpha():
+            self.result.append("&%s;" % name)
+
+    def handle_charref(self, name):
+        if name.isdigit():
+            self.result.append("&#%s;" % name)
+
+
+class Sanitizer(object):
+    def __init__(self, allow_tags=None, pool_size=16):
+        self.rules = SanitizeRules(allow_tags)
+        self.pool_size = pool_size
+        self._pool = []
+        self._lock = threading.Lock()
+
+    def acquire_parser(self):
+        with self._lock:
+            if self._pool:
+                return self._pool.pop()
+        return SanitizeParser(self.rules)
+
+    def release_parser(self, parser):
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(parser)
+
+    @staticmethod
+    def is_plain_text(html):
+        """
+        不包含标签及实体的纯文本，解析器只会产生一段文本数据，无需解析
+        """
+        return isinstance(html, str) and "<" not in html and "&" not in html
+
+    def _sanitize(self, parser, html):
+        if self.is_plain_text(html):
+            return htmlspecialchars(html).strip("\n")
+        try:
+            return parser.sanitize(html)
+        except Exception:
+            # 与 check_script 一致，过滤失败时返回原内容
+            return html
+
+    def sanitize(self, html):
+        if self.is_plain_text(html):
+            return htmlspecialchars(html).strip("\n")
+        parser = self.acquire_parser()
+        try:
+            return self._sanitize(parser, html)
+        finally:
+            self.release_parser(parser)
+
+    def sanitize_many(self, htmls):
+        """
+        批量过滤
+        @param htmls: 富文本列表
+        @return: 过滤后的列表，顺序与输入一致
+        """
+        parser = self.acquire_parser()
+        try:
+            return [self._sanitize(parser, html) for html in htmls]
+        finally:
+            self.release_parser(parser)
+
+
+sanitizer = Sanitizer()
@@ -11,7 +11,7 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-from .pxfilter import XssHtml
+from .sanitizer import sanitizer
 
 """
 蓝鲸平台提供的公用方法
@@ -97,13 +97,7 @@ def check_script(str_escape):
     @param str_escape: 要检测的字符串
     @param fromtype: 0：views，1：middleware
     """
-    try:
-        parser = XssHtml()
-        parser.feed(str_escape)
-        parser.close()
-        return parser.get_html()
-    except Exception:
-        return str_escape
+    return sanitizer.sanitize(str_escape)
 
 
 def escape_new(s, fromtype, is_json):
@@ -17,6 +17,7 @@ from django.contrib.auth import get_user_model
 from django.utils.module_loading import import_string
 
 from blueapps.conf import settings
+from blueapps.core.cache.backends import LocalLRUCache
 from blueapps.core.exceptions import AccessForbidden, MethodError
 from blueapps.utils.request_provider import get_request
 
@@ -64,6 +65,38 @@ try:
 except AttributeError:
     ESB_SDK_NAME = "blueking.component.{platform}".format(platform=settings.RUN_VER)
 
+# 已解析的 sdk 类/函数，避免每次调用都执行 import_string
+_imported_sdk_objects = {}
+
+# 自定义 api 创建的 sdk ComponentAPI，按 (path, method, common_args) 缓存
+# common_args 中包含用户凭证(bk_username/bk_token/access_token)，限制条目数避免随用户增长
+custom_api_cache = LocalLRUCache(settings.BK_ESB_CUSTOM_API_CACHE_SIZE, pickled=False)
+
+
+def cached_import_string(dotted_path):
+    try:
+        return _imported_sdk_objects[dotted_path]
+    except KeyError:
+        obj = _imported_sdk_objects[dotted_path] = import_string(dotted_path)
+        return obj
+
+
+def get_hashable_args(common_args):
+    """将 common_args 转换为可作为缓存 key 的元组，无法转换时返回 None"""
+    try:
+        key = tuple(sorted(common_args.items()))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def get_request_user_key(request):
+    """请求内 sdk 对象按用户区分的 key，未登录时为空字符串"""
+    user = getattr(request, "user", None)
+    is_authenticated = getattr(user, "is_authenticated", False)
+    return getattr(user, "username", "") if is_authenticated else ""
+
 
 class SDKClient(object):
     sdk_package = None
@@ -94,21 +127,42 @@ class SDKClient(object):
 
     def __getattr__(self, item):
         if not self.mod_name:
-            ret = SDKClient(**self.common_args)
-            ret.mod_name = item
-            ret.setup_modules()
-            if isinstance(ret.sdk_mod, collections.Callable):
-                return ret.sdk_mod
-            return ret
+            return self.get_module(item)
         else:
             # 真实sdk调用入口
             ret = getattr(self.sdk_mod, item, None)
             if ret is None:
-                ret = ComponentAPICollection(self).add_api(item)
+                # 复用 collection 上已创建的 api
+                ret = getattr(ComponentAPICollection(self), item)
         if not isinstance(ret, collections.Callable):
             ret = self
         return ret
 
+    def get_module(self, mod_name):
+        """
+        同一请求内按用户复用已解析的 sdk 模块(client.cc)，非 Web 请求中每次重新解析
+        """
+        try:
+            request = get_request()
+        except Exception:
+            request = None
+        args_key = get_hashable_args(self.common_args)
+        if request is None or args_key is None:
+            return self.build_module(mod_name)
+        cache_key = (get_request_user_key(request), args_key, mod_name)
+        request_modules = request.__dict__.setdefault("_blueapps_sdk_modules", {})
+        if cache_key not in request_modules:
+            request_modules[cache_key] = self.build_module(mod_name)
+        return request_modules[cache_key]
+
+    def build_module(self, mod_name):
+        ret = SDKClient(**self.common_args)
+        ret.mod_name = mod_name
+        ret.setup_modules()
+        if isinstance(ret.sdk_mod, collections.Callable):
+            return ret.sdk_mod
+        return ret
+
     def setup_modules(self):
         self.sdk_mod = getattr(self.sdk_client, self.mod_name, None)
         if self.sdk_mod is None:
@@ -118,8 +172,7 @@ class SDKClient(object):
     def sdk_client(self):
         try:
             request = get_request()
-            # 调用sdk方法获取sdk client
-            return self.load_sdk_class("shortcuts", "get_client_by_request")(request)
+            return self.get_request_sdk_client(request)
         except Exception:
             if settings.RUN_MODE != "DEVELOP":
                 if self.common_args:
@@ -131,7 +184,7 @@ class SDKClient(object):
             else:
                 # develop mode
                 # 根据RUN_VER获得get_component_client_common_args函数
-                get_component_client_common_args = import_string(
+                get_component_client_common_args = cached_import_string(
                     "blueapps.utils.sites.{platform}."
                     "get_component_client_common_args".format(platform=settings.RUN_VER)
                 )
@@ -141,9 +194,20 @@ class SDKClient(object):
                     common_args=get_component_client_common_args(),
                 )
 
+    def get_request_sdk_client(self, request):
+        """
+        同一请求内按用户复用 sdk client，生命周期与 request 一致
+        """
+        cache_key = get_request_user_key(request)
+        request_clients = request.__dict__.setdefault("_blueapps_sdk_clients", {})
+        if cache_key not in request_clients:
+            # 调用sdk方法获取sdk client
+            request_clients[cache_key] = self.load_sdk_class("shortcuts", "get_client_by_request")(request)
+        return request_clients[cache_key]
+
     def load_sdk_class(self, mod, attr_or_class):
         dotted_path = "{}.{}.{}".format(self.__backend__, mod, attr_or_class)
-        return import_string(dotted_path)
+        return cached_import_string(dotted_path)
 
     def patch_sdk_component_api_class(self):
         def patch_get_item(self, item):
@@ -179,6 +243,8 @@ class ComponentAPICollection(object):
         return custom_api
 
     def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
         api = self.add_api(item)
         return api
 
@@ -189,20 +255,36 @@ class CustomComponentAPI(object):
     def __init__(self, collection, action):
         self.collection = collection
         self.action = action
+        self.path = "{api_prefix}{collection}/{action}/".format(
+            api_prefix=ESB_API_PREFIX, collection=collection.client.mod_name, action=action
+        )
 
     def __getattr__(self, method):
+        if method.startswith("_"):
+            # make api can be pickled and copied
+            raise AttributeError(method)
+
         method = method.upper()
         if method not in self.allowed_methods:
             raise MethodError("esb api does not support method: %s" % method)
+
+        common_args = self.collection.client.common_args
+        args_key = get_hashable_args(common_args)
+        cache_key = (self.path, method, args_key) if args_key is not None else None
+        api = custom_api_cache.get(cache_key) if cache_key is not None else None
+        if api is not None:
+            return api
+
         api_cls = self.collection.client.load_sdk_class("base", "ComponentAPI")
-        return api_cls(
-            client=SDKClient(**self.collection.client.common_args),
+        api = api_cls(
+            client=SDKClient(**common_args),
             method=method,
-            path="{api_prefix}{collection}/{action}/".format(
-                api_prefix=ESB_API_PREFIX, collection=self.collection.client.mod_name, action=self.action
-            ),
+            path=self.path,
             description="custom api(%s)" % self.action,
         )
+        if cache_key is not None:
+            custom_api_cache.set(cache_key, api, settings.BK_ESB_CUSTOM_API_CACHE_EXPIRED)
+        return api
 
     def __call__(self, *args, **kwargs):
         raise NotImplementedError("custom api `%s` must specify the request method" % self.action)
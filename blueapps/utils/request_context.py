@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云PaaS平台社区版 (BlueKing PaaS Community
+Edition) available.
+Copyright (C) 2017-2020 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import functools
+
+try:
+    from contextvars import ContextVar, copy_context
+except ImportError:
+    ContextVar = copy_context = None
+
+try:
+    from greenlet import getcurrent as get_ident
+except ImportError:
+    from _thread import get_ident
+
+"""
+基于 contextvars 的请求上下文
+
+当前请求保存在 ContextVar 中，读取为 O(1)，在线程、greenlet 及 asyncio 下都互相隔离。
+提交到线程池的任务需要通过 wrap_context 包装，才能继承提交时的上下文；
+流式响应的内容需要通过 wrap_iterator 包装，在请求结束后迭代时仍能读取当前请求。
+
+Python 3.6 且未安装 contextvars 兼容包时，退化为按线程/greenlet ident 保存，行为与原请求池一致。
+"""
+
+
+class IdentVar(object):
+    """
+    ContextVar 的简化替代，按线程/greenlet ident 保存
+    """
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+        self._storage = {}
+
+    def get(self, default=None):
+        return self._storage.get(get_ident(), default if default is not None else self.default)
+
+    def set(self, value):
+        ident = get_ident()
+        token = (ident, self._storage.get(ident, self.default))
+        self._storage[ident] = value
+        return token
+
+    def reset(self, token):
+        ident, old_value = token
+        if old_value is self.default:
+            self._storage.pop(ident, None)
+        else:
+            self._storage[ident] = old_value
+
+
+if ContextVar is not None:
+    _current_request = ContextVar("blueapps_current_request", default=None)
+else:
+    _current_request = IdentVar("blueapps_current_request")
+
+
+def get_current_request():
+    """
+    @return: 当前请求，不在请求上下文中时返回 None
+    """
+    return _current_request.get()
+
+
+def set_current_request(request):
+    """
+    @return: token，请求结束时传给 reset_current_request 恢复
+    """
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    try:
+        _current_request.reset(token)
+    except ValueError:
+        # token 不是在当前上下文中创建的(如中间件的 process_response 运行在不同的上下文)
+        _current_request.set(None)
+
+
+def wrap_context(func):
+    """
+    包装函数，使其在其他线程中执行时继承当前的请求上下文
+    """
+    if copy_context is not None:
+        context = copy_context()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # 同一个 Context 不能被多个线程同时进入，每次执行使用一份拷贝
+            return context.copy().run(func, *args, **kwargs)
+
+        return wrapper
+
+    request = get_current_request()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = set_current_request(request)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            reset_current_request(token)
+
+    return wrapper
+
+
+def wrap_iterator(iterable):
+    """
+    包装迭代器，每次取值时进入调用此函数时的请求上下文
+    StreamingHttpResponse 的内容由 WSGI 服务器在中间件返回(请求上下文已重置)后迭代，需要通过此函数包装
+    """
+    iterator = iter(iterable)
+    if copy_context is not None:
+        context = copy_context()
+
+        def step():
+            return context.run(next, iterator)
+
+    else:
+        request = get_current_request()
+
+        def step():
+            token = set_current_request(request)
+            try:
+                return next(iterator)
+            finally:
+                reset_current_request(token)
+
+    # 上下文需要在调用时立即捕获，逐项取值的生成器单独定义
+    return _iter_steps(step, iterator)
+
+
+def _iter_steps(step, iterator):
+    try:
+        while True:
+            try:
+                item = step()
+            except StopIteration:
+                return
+            yield item
+    finally:
+        # 客户端断开时 WSGI 服务器关闭响应，同时关闭内层的生成器
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
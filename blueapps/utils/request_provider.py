@@ -16,17 +16,7 @@ from django.utils.deprecation import MiddlewareMixin
 
 from blueapps.conf import settings
 from blueapps.core.exceptions import AccessForbidden, ServerBlueException
-
-# since each thread has its own greenlet we can just use those as identifiers
-# for the context.  If greenlets are not available we fall back to the
-# current thread ident depending on where it is.
-try:
-    from greenlet import getcurrent as get_ident
-except ImportError:
-    try:
-        from thread import get_ident
-    except ImportError:
-        from _thread import get_ident
+from blueapps.utils.request_context import get_current_request, reset_current_request, set_current_request
 
 
 class AccessorSignal(Signal):
@@ -59,7 +49,6 @@ class RequestProvider(MiddlewareMixin):
 
     def __init__(self, get_response):
         super(RequestProvider, self).__init__(get_response)
-        self._request_pool = {}
         request_accessor.connect(self)
 
     def process_request(self, request):
@@ -83,11 +72,14 @@ class RequestProvider(MiddlewareMixin):
         # JWT请求
         request.is_bk_jwt = lambda: bool(request.META.get("HTTP_X_BKAPI_JWT", ""))
 
-        self._request_pool[get_ident()] = request
+        request._blueapps_context_token = set_current_request(request)
         return None
 
     def process_response(self, request, response):
-        assert request is self._request_pool.pop(get_ident())
+        token = getattr(request, "_blueapps_context_token", None)
+        if token is not None:
+            reset_current_request(token)
+            del request._blueapps_context_token
         return response
 
     def __call__(self, *args, **kwargs):
@@ -102,16 +94,17 @@ class RequestProvider(MiddlewareMixin):
             return super(RequestProvider, self).__call__(args[0])
 
     def get_request(self, **kwargs):
-        sender = kwargs.get("sender")
-        if sender is None:
-            sender = get_ident()
-        if sender not in self._request_pool:
-            raise ServerBlueException(u"get_request can't be called in a new thread.")
-        return self._request_pool[sender]
+        return get_request()
 
 
 def get_request():
-    return request_accessor.send(get_ident(), from_signal=True)[0][1]
+    """
+    获取当前请求，直接读取请求上下文，不再经过 signal 分发
+    """
+    request = get_current_request()
+    if request is None:
+        raise ServerBlueException(u"get_request can't be called in a new thread.")
+    return request
 
 
 def get_x_request_id():
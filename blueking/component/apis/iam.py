@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
+import time
 
 from ..base import ComponentAPI
 from ..exceptions import ComponentAPIException
@@ -8,6 +9,21 @@ logger = logging.getLogger("component")
 
 
 class ComponentAPIV2(ComponentAPI):
+    # 写操作(非GET)成功后的回调，用于通知本地权限缓存失效，回调参数: (api, data, result)
+    write_listeners = []
+
+    @classmethod
+    def add_write_listener(cls, listener):
+        if listener not in cls.write_listeners:
+            cls.write_listeners.append(listener)
+
+    def notify_write(self, data, result):
+        for listener in self.write_listeners:
+            try:
+                listener(self, data, result)
+            except Exception:
+                logger.exception("IAM write listener error, url=%s", self.url)
+
     def get_url_with_api_ver(self, data):
         grade_manager_id, group_id = data.get("grade_manager_id", ""), data.get("group_id", "")
         bk_api_ver = self.client.get_bk_api_ver()
@@ -16,8 +32,9 @@ class ComponentAPIV2(ComponentAPI):
 
     def __call__(self, *args, **kwargs):
         self.url = self.get_url_with_api_ver(*args, **kwargs)
+        started = time.time()
         try:
-            return self._call(*args, **kwargs)
+            result = self._call(*args, **kwargs)
         except ComponentAPIException as e:
             # Combine log message
             log_message = [e.error_message, "url={url}".format(url=e.api_obj.url)]
@@ -33,6 +50,12 @@ class ComponentAPIV2(ComponentAPI):
                 except (TypeError, ValueError):
                     pass
             return {"result": False, "message": e.error_message, "data": None}
+        finally:
+            self.notify_call(time.time() - started)
+
+        if self.method != "GET" and isinstance(result, dict) and result.get("result"):
+            self.notify_write(args[0] if args else kwargs, result)
+        return result
 
 
 class CollectionsIAM(object):
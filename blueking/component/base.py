@@ -1,18 +1,30 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import re
+import time
 
 from .conf import COMPONENT_SYSTEM_HOST
 from .exceptions import ComponentAPIException
 
 logger = logging.getLogger("component")
 
+COLLECTION_PATH_RE = re.compile(r"^/api/c/compapi(?:\{bk_api_ver\}|/v\d+)/([^/]+)/")
+
 
 class ComponentAPI(object):
     """Single API for Component"""
 
     HTTP_STATUS_OK = 200
 
+    # 每次调用完成后的回调，用于统计调用次数及耗时，回调参数: (api, duration)
+    call_listeners = []
+
+    @classmethod
+    def add_call_listener(cls, listener):
+        if listener not in cls.call_listeners:
+            cls.call_listeners.append(listener)
+
     def __init__(self, client, method, path, description="", default_return_value=None):
         host = COMPONENT_SYSTEM_HOST
         # Do not use join, use '+' because path may starts with '/'
@@ -23,6 +35,18 @@ class ComponentAPI(object):
         self.method = method
         self.default_return_value = default_return_value
 
+    @property
+    def collection(self):
+        match = COLLECTION_PATH_RE.match(self.path)
+        return match.group(1) if match else ""
+
+    def notify_call(self, duration):
+        for listener in self.call_listeners:
+            try:
+                listener(self, duration)
+            except Exception:
+                logger.exception("Component call listener error, url=%s", self.url)
+
     def get_url_with_api_ver(self):
         bk_api_ver = self.client.get_bk_api_ver()
         sub_path = "/{}".format(bk_api_ver) if bk_api_ver else ""
@@ -30,6 +54,7 @@ class ComponentAPI(object):
 
     def __call__(self, *args, **kwargs):
         self.url = self.get_url_with_api_ver()
+        started = time.time()
         try:
             return self._call(*args, **kwargs)
         except ComponentAPIException as e:
@@ -47,6 +72,8 @@ class ComponentAPI(object):
                 except (TypeError, ValueError):
                     pass
             return {"result": False, "message": e.error_message, "data": None}
+        finally:
+            self.notify_call(time.time() - started)
 
     def _call(self, *args, **kwargs):
         params, data = {}, {}
@@ -75,6 +75,18 @@ MIDDLEWARE += (  # noqa
     "utils.middlewares.RequestMiddleware",
 )
 
+# 启动时预先解析的跨app调用目标(utils.app_utils.AppUtils), 格式 [(模块, 名称), ...]
+APP_UTILS_WARM_UP_TARGETS = [
+    ("home_application.views", "get_init_data"),
+]
+# 首页初始化数据依赖的模型, 保存、删除时失效首页缓存(base_index.views), 格式 ["app_label.ModelName", ...]
+HOME_INIT_DATA_MODELS = []
+
+# 请求性能统计, 响应头 Server-Timing 及 performance 日志
+# 放在 RequestProvider 之后、session 及登录中间件之前，统计其中的 SQL 及缓存读取
+if os.environ.get("BKAPP_ENABLE_PROFILING", "false").lower() == "true":
+    MIDDLEWARE = MIDDLEWARE[:1] + ("blueapps.middleware.profiling.middlewares.ProfilingMiddleware",) + MIDDLEWARE[1:]  # noqa
+
 # 配置缓存
 CACHES = locals()["CACHES"]
 REDIS_PASSWORD = os.environ.get("BKAPP_REDIS_PASSWORD", "123456")
@@ -96,6 +108,24 @@ else:
             "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
         },
     }
+    # 登录态缓存改用 redis, 并增加短时间的进程内读缓存
+    # 注销、删除 session 只失效当前进程的读缓存，其他进程最多在 LOCAL_TIMEOUT 秒内仍读到旧值
+    CACHES["login_db"] = {
+        "BACKEND": "blueapps.core.cache.backends.ReadThroughCache",
+        "LOCATION": "redis",
+        "KEY_PREFIX": "login",
+        "OPTIONS": {"LOCAL_TIMEOUT": 5},
+    }
+    CACHES["session"] = {
+        "BACKEND": "blueapps.core.cache.backends.ReadThroughCache",
+        "LOCATION": "redis",
+        "KEY_PREFIX": "session",
+        "OPTIONS": {"LOCAL_TIMEOUT": 2},
+    }
+    # session 存储到 redis, 开启前先执行 python manage.py migrate_sessions_to_cache 复制未过期的 session
+    if os.environ.get("BKAPP_USE_REDIS_SESSION", "false").lower() == "true":
+        SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+        SESSION_CACHE_ALIAS = "session"
 
 if "redis" in CACHES:
     CACHES["default"] = CACHES["redis"]
@@ -143,6 +173,21 @@ CELERY_IMPORTS = ()
 
 DEFAULT_CELERY_SHORT_TIMEDELTA = os.getenv("BKAPP_DEFAULT_CELERY_SHORT_TIMEDELTA", 5 * 60)
 
+# 日志队列模式, 开启后日志由后台线程格式化及写入文件
+LOG_QUEUE_ENABLED = os.getenv("BKAPP_LOG_QUEUE_ENABLED", "false").lower() == "true"
+# 队列长度及队列满时的策略: drop 丢弃新日志, block 最多等待 1 秒
+LOG_QUEUE_SIZE = int(os.getenv("BKAPP_LOG_QUEUE_SIZE", 10000))
+LOG_QUEUE_OVERFLOW = os.getenv("BKAPP_LOG_QUEUE_OVERFLOW", "drop")
+
+# 组件、API 及异常日志的限流、抽样及截断
+# 每个日志调用位置在 LOG_RATE_LIMIT_PERIOD 秒内最多输出 LOG_RATE_LIMIT 条
+LOG_RATE_LIMIT = int(os.getenv("BKAPP_LOG_RATE_LIMIT", 20))
+LOG_RATE_LIMIT_PERIOD = int(os.getenv("BKAPP_LOG_RATE_LIMIT_PERIOD", 60))
+# API 访问日志(INFO)的抽样比例
+LOG_SAMPLE_RATE = float(os.getenv("BKAPP_LOG_SAMPLE_RATE", 1.0))
+# 单条日志的最大长度, 超出部分截断
+LOG_MAX_MESSAGE_LENGTH = int(os.getenv("BKAPP_LOG_MAX_MESSAGE_LENGTH", 1024 * 10))
+
 # load logging settings
 LOGGING = get_logging_config_dict(locals())
 
@@ -256,6 +301,8 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
     # "EXCEPTION_HANDLER": "utils.exception_capture.common_exception_handler",
 }
+# 使用 packages.drf.caching.CachedListMixin 缓存接口结果的模型, 格式 ["app_label.ModelName", ...]
+DRF_CACHED_MODELS = []
 
 HAYSTACK_CONNECTIONS = {
     "default": {
@@ -13,6 +13,7 @@ specific language governing permissions and limitations under the License.
 
 import os
 
+from blueapps.core.lazy_import import lazy_imports_enabled
 from config import RUN_VER
 
 if RUN_VER == "open":
@@ -23,6 +24,10 @@ else:
 # 正式环境
 RUN_MODE = "PRODUCT"
 
+# 惰性导入模式下不加载 swagger, 只有开发环境挂载了 /docs/
+if lazy_imports_enabled():
+    INSTALLED_APPS = tuple(_app for _app in INSTALLED_APPS if _app != "rest_framework_swagger")  # noqa
+
 # 只对正式环境日志级别进行配置，可以在这里修改
 # from blueapps.conf.log import set_log_level # noqa
 # LOG_LEVEL = "ERROR"
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import os  # noqa
 
+from blueapps.core.lazy_import import lazy_imports_enabled
 from config import RUN_VER
 
 if RUN_VER == "open":
@@ -11,6 +12,10 @@ else:
 # 预发布环境
 RUN_MODE = "STAGING"
 
+# 惰性导入模式下不加载 swagger, 只有开发环境挂载了 /docs/
+if lazy_imports_enabled():
+    INSTALLED_APPS = tuple(_app for _app in INSTALLED_APPS if _app != "rest_framework_swagger")  # noqa
+
 DATABASES.update(  # noqa
     {
         "default": {
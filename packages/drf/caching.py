@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+列表/详情接口的结果缓存，适用于读多写少的配置类数据
+缓存渲染后的响应内容，命中时不再查询数据库、序列化及渲染
+
+使用方法:
+
+class ConfigViewSet(CachedListMixin, ModelViewSet):
+    list_cache_timeout = 300
+    list_cache_scope = "global"  # 数据与用户无关时所有用户共享缓存，默认按用户区分
+    list_cache_models = (ConfigItem,)  # 影响列表内容的其他模型(如嵌套序列化的关联模型)
+
+缓存 key 由模型、缓存版本、action、URL 参数、规范化后的查询参数、用户范围及返回格式组成
+模型的 save/delete 信号以及视图的 perform_create/perform_update/perform_destroy 会递增模型的缓存版本，使旧缓存全部失效
+批量的 queryset.update()/delete() 不触发信号，需要自行调用 invalidate_model_cache(model)
+
+celery worker、管理命令等进程不会导入视图，缓存的模型需要同时加入 settings.DRF_CACHED_MODELS，
+由 BaseIndexConfig.ready() 在所有进程启动时连接失效信号:
+
+DRF_CACHED_MODELS = ["app_label.ConfigItem"]
+
+命中 retrieve 缓存时仍会执行 get_object()，保证对象权限校验(check_object_permissions)不被跳过
+
+命中率: get_list_cache_stats()
+"""
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger("app")
+
+CACHE_VERSION_KEY = "drf_cache:version:{}"
+
+
+def get_model_label(model):
+    return model._meta.label_lower
+
+
+def get_model_cache_version(model, alias="default"):
+    return caches[alias].get(CACHE_VERSION_KEY.format(get_model_label(model))) or 0
+
+
+def invalidate_model_cache(model, alias="default"):
+    """
+    失效模型相关的所有列表/详情缓存
+    """
+    cache = caches[alias]
+    key = CACHE_VERSION_KEY.format(get_model_label(model))
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+class CacheInvalidator(object):
+    """
+    按模型连接 save/delete 信号，每个模型及缓存别名只连接一次
+    """
+
+    def __init__(self):
+        self._connected = set()
+        self._lock = threading.Lock()
+
+    def connect(self, model, alias):
+        key = (get_model_label(model), alias)
+        if key in self._connected:
+            return
+        with self._lock:
+            if key in self._connected:
+                return
+            dispatch_uid = "drf_cache:{}:{}".format(*key)
+            receiver = self.make_receiver(alias)
+            # weak=False: receiver 为闭包，需要保持引用
+            post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            self._connected.add(key)
+
+    @staticmethod
+    def make_receiver(alias):
+        def receiver(sender, **kwargs):
+            invalidate_model_cache(sender, alias)
+
+        return receiver
+
+
+class CacheStats(object):
+    """
+    进程内按视图统计的缓存命中次数
+    """
+
+    def __init__(self):
+        self._stats = defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+
+    def record(self, name, hit):
+        with self._lock:
+            self._stats[name][0 if hit else 1] += 1
+
+    def stats(self):
+        """
+        :return: {"视图名": {"hits": 命中次数, "misses": 未命中次数, "hit_ratio": 命中率}}
+        """
+        with self._lock:
+            items = [(name, hits, misses) for name, (hits, misses) in self._stats.items()]
+        return {
+            name: {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4)}
+            for name, hits, misses in items
+        }
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+invalidator = CacheInvalidator()
+cache_stats = CacheStats()
+
+
+def get_list_cache_stats():
+    return cache_stats.stats()
+
+
+def connect_cached_models(models, alias="default"):
+    """
+    连接模型的失效信号，在 AppConfig.ready() 中调用
+    :param models: ["app_label.ModelName", ...]
+    """
+    for label in models:
+        invalidator.connect(apps.get_model(label), alias)
+
+
+class CachedListMixin(object):
+    """
+    缓存 list/retrieve 的响应，需与 GenericAPIView 一起使用，放在 ModelViewSet 之前
+    """
+
+    list_cache_alias = "default"
+    list_cache_timeout = 60
+    # user: 按用户缓存; global: 所有用户共享; 需要按权限等维度区分时重写 get_cache_scope
+    list_cache_scope = "user"
+    list_cache_actions = ("list", "retrieve")
+    list_cache_models = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super(CachedListMixin, cls).__init_subclass__(**kwargs)
+        queryset = getattr(cls, "queryset", None)
+        models = ([queryset.model] if queryset is not None else []) + list(cls.list_cache_models)
+        configured = {label.lower() for label in getattr(settings, "DRF_CACHED_MODELS", ())}
+        for model in models:
+            invalidator.connect(model, cls.list_cache_alias)
+            if get_model_label(model) not in configured:
+                logger.warning(
+                    "[drf_cache] %s 缓存了 %s 但未加入 DRF_CACHED_MODELS，其他进程的修改不会使缓存失效",
+                    cls.__name__,
+                    model._meta.label,
+                )
+
+    @property
+    def cache(self):
+        return caches[self.list_cache_alias]
+
+    def get_cache_models(self):
+        return (self.get_queryset().model,) + tuple(self.list_cache_models)
+
+    def get_cache_scope(self, request):
+        if self.list_cache_scope == "global":
+            return ""
+        return str(request.user.pk or "")
+
+    def get_cache_key(self, request):
+        models = self.get_cache_models()
+        for model in models:
+            invalidator.connect(model, self.list_cache_alias)
+        versions = [
+            "{}:{}".format(get_model_label(model), get_model_cache_version(model, self.list_cache_alias))
+            for model in models
+        ]
+        params = sorted((key, request.query_params.getlist(key)) for key in request.query_params)
+        parts = [
+            "|".join(versions),
+            self.action,
+            repr(sorted(self.kwargs.items())),
+            repr(params),
+            self.get_cache_scope(request),
+            request.accepted_renderer.format,
+        ]
+        digest = hashlib.md5("\n".join(parts).encode("utf-8")).hexdigest()
+        return "drf_cache:{}:{}".format(self.__class__.__name__, digest)
+
+    def get_cache_stats_name(self):
+        return "{}.{}".format(self.__class__.__module__, self.__class__.__name__)
+
+    def should_cache(self, request):
+        if not self.list_cache_timeout or request.method != "GET" or self.action not in self.list_cache_actions:
+            return False
+        # 流式返回的不分页列表不缓存，见 packages.drf.streaming
+        should_stream = getattr(self, "should_stream", None)
+        return not (self.action == "list" and should_stream and should_stream(request))
+
+    def dispatch(self, request, *args, **kwargs):
+        self._list_cache_key = None
+        return super(CachedListMixin, self).dispatch(request, *args, **kwargs)
+
+    def get_cached_response(self, request):
+        if not self.should_cache(request):
+            return None
+        self._list_cache_key = self.get_cache_key(request)
+        cached = self.cache.get(self._list_cache_key)
+        cache_stats.record(self.get_cache_stats_name(), cached is not None)
+        if cached is None:
+            return None
+        if self.action == "retrieve":
+            # 对象不存在或无权限时抛出 404/403，与未命中缓存时一致
+            self.get_object()
+        return HttpResponse(cached["content"], content_type=cached["content_type"])
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(request) or super(CachedListMixin, self).list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(request) or super(CachedListMixin, self).retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(CachedListMixin, self).finalize_response(request, response, *args, **kwargs)
+        # 流式返回、出错等情况不缓存
+        if self._list_cache_key and isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            response.render()
+            self.cache.set(
+                self._list_cache_key,
+                {"content": response.content, "content_type": response["Content-Type"]},
+                self.list_cache_timeout,
+            )
+        return response
+
+    def invalidate_cache(self):
+        for model in self.get_cache_models():
+            invalidate_model_cache(model, self.list_cache_alias)
+
+    def perform_create(self, serializer):
+        super(CachedListMixin, self).perform_create(serializer)
+        self.invalidate_cache()
+
+    def perform_update(self, serializer):
+        super(CachedListMixin, self).perform_update(serializer)
+        self.invalidate_cache()
+
+    def perform_destroy(self, instance):
+        super(CachedListMixin, self).perform_destroy(instance)
+        self.invalidate_cache()
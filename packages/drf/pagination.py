@@ -8,10 +8,43 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "packages.drf.pagination.CustomPageNumberPagination",
 }
 
+大表(审计、事件等)可在视图中改用游标分页:
+
+class AuditLogViewSet(ModelViewSet):
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
+    keyset_count = "approximate"
+
 """
+import base64
+import json
+import math
+from functools import reduce
 
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def build_keyset_filter(ordering, values, reverse=False):
+    """
+    按排序字段构造 "位于 values 之后" 的条件: (a > x) | (a = x & b > y) | ...
+    :param ordering: 排序字段，如 ("-created_at", "-id")
+    :param values: 上一行在各排序字段上的值
+    :param reverse: 为 True 时构造 "位于 values 之前" 的条件
+    """
+    conditions, equals = [], {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        descending = field.startswith("-") != reverse
+        lookup = "{}__{}".format(name, "lt" if descending else "gt")
+        conditions.append(Q(**equals) & Q(**{lookup: value}))
+        equals[name] = value
+    return reduce(lambda a, b: a | b, conditions)
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -37,3 +70,177 @@ class CustomPageNumberPagination(PageNumberPagination):
                 ]
             )
         )
+
+
+class KeysetPagination(CustomPageNumberPagination):
+    """
+    游标(keyset)分页，返回格式与 CustomPageNumberPagination 一致(page/total_page/count/next/previous/items)
+    按有索引的排序字段(如 TimeInfo.created_at + id)定位，不使用 OFFSET，翻页耗时与页码无关
+
+    请求参数: page_size，以及由 next/previous 链接携带的 cursor
+    视图可配置:
+    - keyset_ordering: 排序字段，默认 ("-created_at", "-id")，末尾字段需唯一，未包含主键时自动追加
+        只支持模型本身不可为空(null=False)的字段，NULL 无法参与大小比较，会导致翻页时跳过或重复数据
+    - keyset_count: 总数的计算方式
+        - "none": 不计算，count/total_page 返回 None(默认)
+        - "approximate": 无过滤条件时读取数据库的表行数估算值，有过滤条件时最多数到 approximate_count_limit
+        - "exact": COUNT(*)
+    """
+
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    count_mode = "none"
+    approximate_count_limit = 10000
+    invalid_cursor_message = "无效的cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if request.GET.get("page_size") in (None, "0", "-1") or not page_size:
+            return None
+
+        self.request = request
+        self.page_size = page_size
+        self.ordering = self.get_ordering(queryset, view)
+        self.count_mode = getattr(view, "keyset_count", self.count_mode)
+        values, reverse, self.page_number = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        self.count = self.get_count(queryset)
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(queryset.model, values, reverse))
+        if reverse:
+            queryset = queryset.reverse()
+
+        results = list(queryset[: page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more and self.page_number > 1
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.first_item = results[0] if results else None
+        self.last_item = results[-1] if results else None
+        return results
+
+    def get_ordering(self, queryset, view):
+        ordering = list(getattr(view, "keyset_ordering", self.ordering))
+        for field in ordering:
+            self.check_ordering_field(queryset.model, field.lstrip("-"))
+        pk_name = queryset.model._meta.pk.name
+        if not any(field.lstrip("-") in ("pk", pk_name) for field in ordering):
+            # 保证排序唯一，主键方向与最后一个字段一致
+            ordering.append("-pk" if ordering and ordering[-1].startswith("-") else "pk")
+        return tuple(ordering)
+
+    @staticmethod
+    def check_ordering_field(model, name):
+        if name == "pk":
+            return
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured("keyset_ordering 字段 {} 不存在于 {}".format(name, model._meta.label))
+        if field.null:
+            raise ImproperlyConfigured("keyset_ordering 字段 {}.{} 可为空，不能用于游标分页".format(model._meta.label, name))
+
+    def get_keyset_filter(self, model, values, reverse):
+        """
+        按排序字段构造 "位于游标之后" 的条件: (a > x) | (a = x & b > y) | ...
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        values = [self.to_python(model, field.lstrip("-"), value) for field, value in zip(self.ordering, values)]
+        return build_keyset_filter(self.ordering, values, reverse)
+
+    @staticmethod
+    def to_python(model, name, value):
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        try:
+            return field.to_python(value)
+        except Exception:
+            raise NotFound(KeysetPagination.invalid_cursor_message)
+
+    def get_count(self, queryset):
+        if self.count_mode == "exact":
+            return queryset.count()
+        if self.count_mode != "approximate":
+            return None
+        if not queryset.query.where:
+            estimate = self.estimate_table_rows(queryset)
+            if estimate is not None:
+                return estimate
+        return queryset.order_by()[: self.approximate_count_limit].count()
+
+    @staticmethod
+    def estimate_table_rows(queryset):
+        """
+        读取数据库统计信息中的表行数(MySQL: information_schema.TABLES.TABLE_ROWS)，其他数据库返回 None
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != "mysql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def get_cursor_values(self, item):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            value = getattr(item, "pk" if name == "pk" else name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    def encode_cursor(self, item, reverse, page_number):
+        payload = json.dumps({"v": self.get_cursor_values(item), "r": int(reverse), "p": page_number}, default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """
+        :return: (排序字段值列表, 是否向前翻页, 页码)，没有游标时为第一页
+        """
+        cursor = request.GET.get(self.cursor_query_param)
+        if not cursor:
+            return None, False, 1
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            return list(payload["v"]), bool(payload["r"]), max(int(payload["p"]), 1)
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_item is None:
+            return None
+        return self.encode_cursor(self.last_item, False, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_item is None:
+            return None
+        if self.page_number <= 2:
+            # 回到第一页不需要游标
+            url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.first_item, True, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        total_page = math.ceil(self.count / self.page_size) if self.count is not None else None
+        return Response(
+            dict(
+                [
+                    ("page", self.page_number),
+                    ("total_page", total_page),
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("items", data),
+                ]
+            )
+        )
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+不分页列表的流式输出
+page_size=0/-1 时不再一次性序列化整个 queryset，而是分批查询、分批序列化，边生成边返回
+
+MySQLdb 默认在客户端缓存整个结果集，queryset.iterator() 仍会一次读入全部数据，因此按批次单独查询:
+- 排序字段均为模型本身不可为空的字段时(包括默认按主键排序)，按排序字段做 keyset 翻页，每批一次查询，内存只与批次大小有关
+- 其他排序(自定义 OrderingFilter 的 extra 排序、关联字段、可为空字段等)先按原顺序读取全部主键，再按主键分批查询，
+  内存中只额外保留主键列表
+
+- ?page_size=-1             流式返回 JSON，格式与 CustomRenderer 一致 {"result", "code", "message", "data": [...]}
+- ?page_size=-1&export=csv  流式返回 CSV 文件，表头为序列化器的字段名
+
+响应内容在视图返回后由 WSGI 服务器迭代生成，此时中间件已重置请求上下文，
+生成时通过 wrap_iterator 重新进入视图中的请求上下文，序列化器中的 get_request()/ESB 调用不受影响
+响应头已发送，生成过程中出错无法再返回错误码: 记录日志后中断连接，客户端收到不完整的内容(JSON 无法解析、CSV 缺少行)
+
+packages.drf.viewsets.ModelViewSet 已默认混入，视图可通过以下属性调整:
+
+class HostViewSet(ModelViewSet):
+    stream_unpaginated = True  # 关闭后恢复为一次性返回
+    stream_chunk_size = 500  # 每批读取及序列化的行数
+"""
+import codecs
+import csv
+import json
+import logging
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+from blueapps.utils.request_context import wrap_iterator
+from packages.drf.pagination import build_keyset_filter
+from packages.drf.renderers import CustomRenderer
+
+logger = logging.getLogger("app")
+
+
+class Echo(object):
+    """csv.writer 的写入目标，直接返回写入的内容"""
+
+    def write(self, value):
+        return value
+
+
+def get_keyset_ordering(queryset):
+    """
+    :return: 可用于 keyset 翻页的排序字段(末尾保证为主键)，无法使用时返回 None
+    """
+    query = queryset.query
+    if query.extra_order_by or query.distinct_fields:
+        return None
+    meta = queryset.model._meta
+    ordering = list(query.order_by or (meta.ordering if query.default_ordering else []))
+    names = []
+    for field in ordering:
+        if not isinstance(field, str) or field == "?":
+            return None
+        name = field.lstrip("-")
+        if name != "pk":
+            try:
+                model_field = meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if model_field.null or model_field.is_relation:
+                return None
+        names.append(name)
+    if not any(name in ("pk", meta.pk.name) for name in names):
+        ordering.append("-pk" if ordering and ordering[-1].startswith("-") else "pk")
+    return ordering
+
+
+def iter_keyset_batches(queryset, ordering, chunk_size):
+    queryset = queryset.order_by(*ordering)
+    names = [field.lstrip("-") for field in ordering]
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(build_keyset_filter(ordering, last))
+        batch = list(page[:chunk_size])
+        if batch:
+            yield batch
+        if len(batch) < chunk_size:
+            return
+        last = [getattr(batch[-1], name) for name in names]
+
+
+def iter_pk_batches(queryset, chunk_size):
+    pks = list(queryset.values_list("pk", flat=True))
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start : start + chunk_size]
+        objs = {obj.pk: obj for obj in queryset.order_by().filter(pk__in=chunk)}
+        yield [objs[pk] for pk in chunk if pk in objs]
+
+
+def iter_batches(queryset, chunk_size):
+    """
+    分批查询 queryset，顺序与 queryset 一致，每批补充 prefetch_related
+    """
+    ordering = get_keyset_ordering(queryset)
+    if ordering is not None:
+        batches = iter_keyset_batches(queryset, ordering, chunk_size)
+    else:
+        batches = iter_pk_batches(queryset, chunk_size)
+    lookups = queryset._prefetch_related_lookups
+    for batch in batches:
+        if lookups:
+            prefetch_related_objects(batch, *lookups)
+        yield batch
+
+
+class JsonStreamEncoder(object):
+    """使用 CustomRenderer 的编码方式，保证与一次性返回的内容一致"""
+
+    def __init__(self, renderer=CustomRenderer):
+        self.encode = renderer().dumps
+
+    def iter_envelope(self, batches, status_code=status.HTTP_200_OK):
+        """
+        :param batches: 每批为已序列化的数据列表
+        """
+        head = self.encode({"result": True, "code": str(status_code * 100), "message": "success", "data": []})
+        # head 以 []} 结尾，拆成前缀与后缀以便在中间逐批写入
+        yield head[:-2]
+        first = True
+        for batch in batches:
+            for item in batch:
+                yield self.encode(item) if first else b"," + self.encode(item)
+                first = False
+        yield head[-2:]
+
+
+def iter_csv(batches, fields):
+    """
+    :param batches: 每批为已序列化的数据列表
+    :param fields: 表头字段
+    """
+    writer = csv.writer(Echo())
+    # 带 BOM，Excel 打开中文不乱码
+    yield codecs.BOM_UTF8 + writer.writerow(fields).encode("utf-8")
+    for batch in batches:
+        rows = []
+        for item in batch:
+            row = []
+            for field in fields:
+                value = item.get(field)
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, ensure_ascii=False)
+                row.append("" if value is None else value)
+            rows.append(writer.writerow(row))
+        yield "".join(rows).encode("utf-8")
+
+
+class StreamingListMixin(object):
+    """
+    不分页时流式返回列表，需与 GenericAPIView 及 ListModelMixin 一起使用
+    """
+
+    stream_unpaginated = True
+    stream_chunk_size = 500
+    stream_page_sizes = ("0", "-1")
+    export_query_param = "export"
+
+    def should_stream(self, request):
+        if not self.stream_unpaginated:
+            return False
+        page_size_query_param = getattr(self.paginator, "page_size_query_param", None) or "page_size"
+        return request.query_params.get(page_size_query_param) in self.stream_page_sizes
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super(StreamingListMixin, self).list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if request.query_params.get(self.export_query_param) == "csv":
+            return self.stream_csv(queryset)
+        return self.stream_json(queryset)
+
+    def iter_serialized(self, queryset):
+        try:
+            for batch in iter_batches(queryset, self.stream_chunk_size):
+                yield self.get_serializer(batch, many=True).data
+        except Exception:
+            logger.exception("[streaming] %s 流式输出中断", self.__class__.__name__)
+            raise
+
+    def stream_json(self, queryset):
+        content = JsonStreamEncoder().iter_envelope(self.iter_serialized(queryset))
+        return StreamingHttpResponse(wrap_iterator(content), content_type="application/json")
+
+    def get_export_fields(self):
+        serializer = self.get_serializer()
+        return [name for name, field in serializer.fields.items() if not field.write_only]
+
+    def get_export_filename(self, queryset):
+        return "{}.csv".format(queryset.model._meta.model_name)
+
+    def stream_csv(self, queryset):
+        content = iter_csv(self.iter_serialized(queryset), self.get_export_fields())
+        response = StreamingHttpResponse(wrap_iterator(content), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="{}"'.format(self.get_export_filename(queryset))
+        return response
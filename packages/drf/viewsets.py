@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 """
 自定义ModelViewSet 补充create 和 update 时的用户相关信息
+不分页(page_size=0/-1)的列表流式返回，见 packages.drf.streaming
 """
 from rest_framework import viewsets
 
+from packages.drf.streaming import StreamingListMixin
 
-class ModelViewSet(viewsets.ModelViewSet):
+
+class ModelViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """按需改造DRF默认的ModelViewSet类"""
 
     def perform_create(self, serializer):
@@ -10,12 +10,12 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
-import os
-
 from django.conf import settings
 from django.conf.urls import include, url
 from django.contrib import admin
 
+from utils.url_manifest import get_app_urlpatterns
+
 urlpatterns = [
     url(r"^admin/", admin.site.urls),
     url(r"^account/", include("blueapps.account.urls")),
@@ -27,18 +27,9 @@ urlpatterns = [
     url(r"^i18n/", include("django.conf.urls.i18n")),
     url(r"^version_log/", include("version_log.urls", namespace="version_log")),
 ]
-apps = {"apps": os.listdir("apps"), "apps_other": os.listdir("apps_other")}
-for key, app_list in apps.items():
-    dir_list = [
-        i
-        for i in app_list
-        if os.path.isdir(f"{key}/{i}")
-        and "urls.py" in os.listdir(f"{key}/{i}")
-        and not i.startswith("__")
-        and i not in ["system_mgmt"]
-    ]  # noqa
-    for i in dir_list:
-        urlpatterns.append(url(r"^{}/".format(i), include(f"{key}.{i}.urls")))  # noqa
+# apps/、apps_other/ 下各 app 的路由，按 url_manifest.json 惰性挂载
+# 新增 app 后执行 python manage.py build_url_manifest 重新生成清单
+urlpatterns += get_app_urlpatterns()
 
 if settings.RUN_MODE == "DEVELOP":
     """
@@ -6,7 +6,10 @@
 
 import base64
 
-from Crypto.Cipher import AES
+from blueapps.core.lazy_import import LazyModule
+
+# 首次加解密时才导入 pycryptodome
+AES = LazyModule("Crypto.Cipher.AES")
 
 """
 AES对称加密算法
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Agent状态批量查询服务
+
+对GSE/节点管理的Agent状态接口进行分批并发调用，并按主机缓存查询结果，
+适用于拓扑等需要一次展示大量主机Agent状态的场景
+
+from utils.agent_status import AgentStatusService
+service = AgentStatusService(client)
+service.get_status_many([{"ip": "10.0.0.1", "bk_cloud_id": 0}])
+=> {"0:10.0.0.1": "RUNNING"}
+"""
+from django.core.cache import cache
+
+from utils import constants
+from utils.app_log import logger
+from utils.muli_process import MultiProcess
+
+AGENT_STATUS_RUNNING = "RUNNING"
+AGENT_STATUS_TERMINATED = "TERMINATED"
+AGENT_STATUS_NOT_INSTALLED = "NOT_INSTALLED"
+AGENT_STATUS_UNKNOWN = "UNKNOWN"
+
+SOURCE_GSE = "gse"
+SOURCE_NODEMAN = "nodeman"
+
+
+class AgentStatusService(object):
+    """
+    Agent状态查询服务
+    """
+
+    cache_key_prefix = "agent_status"
+
+    def __init__(self, client, source=SOURCE_GSE, chunk_size=None, ttl=None, workers=None):
+        """
+        :param client: ESB client
+        :param source: 状态来源 gse/nodeman
+        :param chunk_size: 单次请求的主机数，默认取对应后端的上限
+        :param ttl: 缓存时间(秒)
+        :param workers: 并发数
+        """
+        if source not in (SOURCE_GSE, SOURCE_NODEMAN):
+            raise ValueError("不支持的Agent状态来源: {}".format(source))
+        self.client = client
+        self.source = source
+        if chunk_size is None:
+            if source == SOURCE_GSE:
+                chunk_size = constants.GSE_AGENT_STATUS_CHUNK_SIZE
+            else:
+                chunk_size = constants.NODEMAN_AGENT_STATUS_CHUNK_SIZE
+        self.chunk_size = chunk_size
+        self.ttl = constants.AGENT_STATUS_CACHE_TTL if ttl is None else ttl
+        self.workers = workers or constants.AGENT_STATUS_QUERY_WORKERS
+
+    @staticmethod
+    def host_key(host):
+        """主机唯一标识，与GSE返回数据的key格式保持一致"""
+        return "{}:{}".format(host.get("bk_cloud_id", 0), host["ip"])
+
+    def cache_key(self, host_key):
+        return "{}:{}:{}".format(self.cache_key_prefix, self.source, host_key)
+
+    def get_status(self, host):
+        return self.get_status_many([host])[self.host_key(host)]
+
+    def get_status_many(self, hosts):
+        """
+        批量查询主机Agent状态
+        :param hosts: [{"ip": "10.0.0.1", "bk_cloud_id": 0}, ...]
+        :return: {"0:10.0.0.1": "RUNNING", ...}
+        """
+        host_map = {}
+        for host in hosts:
+            host_map.setdefault(self.host_key(host), host)
+        if not host_map:
+            return {}
+
+        cache_keys = {self.cache_key(key): key for key in host_map}
+        cached = cache.get_many(list(cache_keys.keys()))
+        result = {cache_keys[key]: value for key, value in cached.items()}
+
+        missing = [host for key, host in host_map.items() if key not in result]
+        if missing:
+            fetched, failed = self.fetch_status(missing)
+            # 查询失败的主机不写缓存，避免短时间内展示错误状态
+            cache.set_many(
+                {self.cache_key(key): value for key, value in fetched.items() if key not in failed}, self.ttl
+            )
+            result.update(fetched)
+        return result
+
+    def invalidate(self, hosts):
+        cache.delete_many([self.cache_key(self.host_key(host)) for host in hosts])
+
+    def fetch_status(self, hosts):
+        """
+        分批并发请求后端
+        :return: (状态字典, 查询失败的主机key集合)
+        """
+        chunks = [hosts[i : i + self.chunk_size] for i in range(0, len(hosts), self.chunk_size)]
+        query_func = self._query_gse if self.source == SOURCE_GSE else self._query_nodeman
+
+        if len(chunks) == 1:
+            # 与多批次时 map_ignore_exception(return_exception=True) 一致，异常作为该批次的结果
+            try:
+                chunk_results = [query_func(chunks[0])]
+            except Exception as e:
+                logger.exception(e)
+                chunk_results = [e]
+        else:
+            pool = MultiProcess(processes=min(self.workers, len(chunks)))
+            try:
+                chunk_results = pool.map_ignore_exception(
+                    query_func, [(chunk,) for chunk in chunks], return_exception=True
+                )
+            finally:
+                pool.close()
+
+        default = AGENT_STATUS_UNKNOWN if self.source == SOURCE_GSE else AGENT_STATUS_NOT_INSTALLED
+        status, failed = {}, set()
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            succeed = isinstance(chunk_result, dict)
+            for host in chunk:
+                key = self.host_key(host)
+                if succeed:
+                    status[key] = chunk_result.get(key, default)
+                else:
+                    status[key] = AGENT_STATUS_UNKNOWN
+                    failed.add(key)
+        return status, failed
+
+    def _query_gse(self, hosts):
+        params = {
+            "bk_supplier_account": "0",
+            "hosts": [{"ip": host["ip"], "bk_cloud_id": host.get("bk_cloud_id", 0)} for host in hosts],
+        }
+        res = self.client.gse.get_agent_status(params)
+        if not res.get("result"):
+            logger.error("查询GSE Agent状态失败, message={}".format(res.get("message")))
+            return None
+        status = {}
+        for key, info in (res.get("data") or {}).items():
+            status[key] = AGENT_STATUS_RUNNING if info.get("bk_agent_alive") == 1 else AGENT_STATUS_TERMINATED
+        return status
+
+    def _query_nodeman(self, hosts):
+        params = {
+            "conditions": [{"key": "inner_ip", "value": list({host["ip"] for host in hosts})}],
+            "page": 1,
+            # 同一IP可能存在于多个云区域，按最大数量查询
+            "pagesize": constants.SEARCH_AGENT_MAX_NUM,
+        }
+        res = self.client.nodeman.get_agent_status_info(params)
+        if not res.get("result"):
+            logger.error("查询节点管理Agent状态失败, message={}".format(res.get("message")))
+            return None
+        status = {}
+        for info in (res.get("data") or {}).get("list", []):
+            key = self.host_key({"ip": info.get("inner_ip"), "bk_cloud_id": info.get("bk_cloud_id", 0)})
+            status[key] = info.get("status") or AGENT_STATUS_UNKNOWN
+        return status
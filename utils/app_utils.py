@@ -1,6 +1,93 @@
+import threading
+import time
+from importlib import import_module
+
+from utils.app_log import logger
 from utils.decorators import catch_exception
 
 
+class DispatchRegistry(object):
+    """
+    跨app调用的目标注册表，按 (模块, 名称) 缓存解析结果，之后的调用只需一次字典查找
+    名称支持 "Class.method" 形式的属性链
+    同时按目标统计调用次数及耗时
+    """
+
+    def __init__(self):
+        self._targets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, module, name):
+        """
+        :return: 解析到的对象，模块中不存在该名称时返回 None(同样缓存)，模块导入失败时抛出异常且不缓存
+        """
+        key = (module, name)
+        try:
+            return self._targets[key]
+        except KeyError:
+            pass
+
+        target = import_module(module)
+        for attr in name.split("."):
+            target = getattr(target, attr, None)
+            if target is None:
+                break
+        self._targets[key] = target
+        return target
+
+    def warm_up(self, targets):
+        """
+        启动时预先解析
+        :param targets: [(模块, 名称), ...]
+        """
+        for module, name in targets:
+            try:
+                if self.resolve(module, name) is None:
+                    logger.warning("[app_utils] 预加载的调用目标不存在: {}.{}".format(module, name))
+            except Exception:
+                logger.exception("[app_utils] 预加载调用目标失败: {}.{}".format(module, name))
+
+    def call(self, module, name, *args, **kwargs):
+        func = self.resolve(module, name)
+        if not func:
+            return None
+        started = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(module, name, time.time() - started)
+
+    def record(self, module, name, duration):
+        key = (module, name)
+        with self._lock:
+            count, total = self._stats.get(key, (0, 0.0))
+            self._stats[key] = (count + 1, total + duration)
+
+    def stats(self):
+        """
+        :return: {"模块.名称": {"count": 调用次数, "total": 总耗时(毫秒), "avg": 平均耗时(毫秒)}}
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        return {
+            "{}.{}".format(module, name): {
+                "count": count,
+                "total": round(total * 1000, 2),
+                "avg": round(total * 1000 / count, 3),
+            }
+            for (module, name), (count, total) in items
+        }
+
+    def clear(self):
+        with self._lock:
+            self._targets.clear()
+            self._stats.clear()
+
+
+registry = DispatchRegistry()
+
+
 class AppUtils(object):
     def __init__(self):
         pass
@@ -8,40 +95,39 @@ class AppUtils(object):
     @staticmethod
     @catch_exception
     def interface_call(app_model, app_fun, kwargs):
-        m = __import__(app_model, globals(), locals(), ["*"])
-        method = getattr(m, app_fun, False)
-        if method:
-            return method(**kwargs)
+        return registry.call(app_model, app_fun, **kwargs)
 
     @staticmethod
     @catch_exception
     def class_call(app_model, class_name, app_fun, class_kwargs, fun_kwargs):
-        m = __import__(app_model, globals(), locals(), ["*"])
-        cls = getattr(m, class_name, False)
+        cls = registry.resolve(app_model, class_name)
         if not cls:
             return
-        cls_inst = cls(**class_kwargs)
-        method = getattr(cls_inst, app_fun, False)
-        if method:
-            return method(**fun_kwargs)
+        started = time.time()
+        try:
+            method = getattr(cls(**class_kwargs), app_fun, False)
+            if method:
+                return method(**fun_kwargs)
+        finally:
+            registry.record(app_model, "{}.{}".format(class_name, app_fun), time.time() - started)
 
     @staticmethod
     @catch_exception
     def static_class_call(app_model, class_name, app_fun, *fun_args, **fun_kwargs):
-        m = __import__(app_model, globals(), locals(), ["*"])
-        cls = getattr(m, class_name, False)
-        if not cls:
-            return
-        method = getattr(cls, app_fun, False)
-        if method:
-            return method(*fun_args, **fun_kwargs)
+        return registry.call(app_model, "{}.{}".format(class_name, app_fun), *fun_args, **fun_kwargs)
 
     @staticmethod
     @catch_exception
     def get_model(app_path, model_name):
-        m = __import__(app_path, globals(), locals(), ["*"])
-        model = getattr(m, model_name, None)
-        return model
+        return registry.resolve(app_path, model_name)
+
+    @staticmethod
+    def warm_up(targets):
+        registry.warm_up(targets)
+
+    @staticmethod
+    def stats():
+        return registry.stats()
 
 
 # from common.app_utils import AppUtils
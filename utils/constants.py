@@ -28,6 +28,23 @@ LIST_OPERATION_AUDIT_MAX_NUM = 200
 SEARCH_WORK_ORDER_MAX_NUM = 100
 # 查询agent最大数量
 SEARCH_AGENT_MAX_NUM = 10000
+# GSE/节点管理 单次查询agent状态的主机数
+GSE_AGENT_STATUS_CHUNK_SIZE = int(os.getenv("BKAPP_GSE_AGENT_STATUS_CHUNK_SIZE", 1000))
+NODEMAN_AGENT_STATUS_CHUNK_SIZE = int(os.getenv("BKAPP_NODEMAN_AGENT_STATUS_CHUNK_SIZE", 500))
+# agent状态缓存时间(秒)
+AGENT_STATUS_CACHE_TTL = int(os.getenv("BKAPP_AGENT_STATUS_CACHE_TTL", 30))
+# agent状态并发查询线程数
+AGENT_STATUS_QUERY_WORKERS = int(os.getenv("BKAPP_AGENT_STATUS_QUERY_WORKERS", 10))
+
+# IAM用户权限快照缓存时间(秒)
+IAM_SNAPSHOT_CACHE_TTL = int(os.getenv("BKAPP_IAM_SNAPSHOT_CACHE_TTL", 10 * 60))
+# IAM用户权限快照后台刷新间隔(秒)
+IAM_SNAPSHOT_REFRESH_INTERVAL = int(os.getenv("BKAPP_IAM_SNAPSHOT_REFRESH_INTERVAL", 60))
+
+# 首页初始化数据(get_init_data)按用户缓存的时间(秒), 0 表示不缓存
+HOME_INIT_DATA_CACHE_TTL = int(os.getenv("BKAPP_HOME_INIT_DATA_CACHE_TTL", 5 * 60))
+# 首页渲染结果按用户及语言缓存的时间(秒), 0 表示不缓存
+HOME_PAGE_CACHE_TTL = int(os.getenv("BKAPP_HOME_PAGE_CACHE_TTL", 5 * 60))
 
 # 作业状态码
 JOB_STATUS_SUCCESS = 3  # 执行成功
@@ -7,6 +7,7 @@ import wrapt
 from django.core.cache import cache
 from django.views.generic.base import View
 
+from blueapps.core.log.utils import LazyString
 from utils import constants
 from utils.app_log import api_logger, logger
 from utils.exceptions import CustomApiException
@@ -26,28 +27,37 @@ class ApiLog(object):
             request = args[0]
             if isinstance(request, View):
                 request = args[1]
-            if request.method == "GET":
-                params = json.dumps(getattr(request, "GET", None))
-            else:
-                try:
-                    params = json.dumps(getattr(request, "data", None))
-                except TypeError:
-                    params = getattr(request, "data", None).get("file").name
-                except Exception:
-                    params = ""
             user = request.user.username
             ip = getattr(request, "current_ip", "")
             if not ip:
                 ip = get_client_ip(request)
                 setattr(request, "current_ip", ip)
+            # 请求参数在日志实际输出时才序列化，被抽样或限流丢弃的日志不产生序列化开销
             api_logger.info(
-                f"[{ip}]使用帐号[{user}] 请求接口[{self.func_info}]，请求方法[{request.method}]，请求地址[{request.path}]，请求参数[{params}]"
+                "[%s]使用帐号[%s] 请求接口[%s]，请求方法[%s]，请求地址[%s]，请求参数[%s]",
+                ip,
+                user,
+                self.func_info,
+                request.method,
+                request.path,
+                LazyString(dump_request_params, request),
             )
             return task_definition(*args, **kwargs)
 
         return wrapper
 
 
+def dump_request_params(request):
+    if request.method == "GET":
+        return json.dumps(getattr(request, "GET", None))
+    try:
+        return json.dumps(getattr(request, "data", None))
+    except TypeError:
+        return getattr(request, "data", None).get("file").name
+    except Exception:
+        return ""
+
+
 def get_client_ip(request):
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
     if x_forwarded_for:
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+权限中心(IAM)用户权限快照缓存
+
+按用户缓存其所属的分级管理员及用户组，供权限相关页面直接读取，避免每次请求都调用IAM管理类接口
+- 快照超过 IAM_SNAPSHOT_REFRESH_INTERVAL 后返回旧数据并在后台线程刷新
+- 通过ESB调用IAM写接口(添加/删除成员、删除用户组等)成功后，整体失效所有用户快照，
+  监听由 BaseIndexConfig.ready() 在所有进程启动时注册
+
+from utils.iam_permission import permission_snapshot
+permission_snapshot.is_grade_manager_member("admin", 1)
+permission_snapshot.allowed_many("admin", ["manage_grade_manager"], [{"id": 1, "grade_manager_id": 1}])
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from blueking.component.apis.iam import ComponentAPIV2
+from blueking.component.shortcuts import get_client_by_user
+from utils import constants
+from utils.app_log import logger
+from utils.muli_process import InheritParentThread
+
+# 内置的动作规则
+ACTION_GRADE_MANAGER_MEMBER = "manage_grade_manager"
+ACTION_GROUP_MEMBER = "access_user_group"
+
+
+def grade_manager_member_rule(snapshot, resource):
+    """用户是资源所属分级管理员的成员"""
+    return resource.get("grade_manager_id") in snapshot["grade_managers"]
+
+
+def group_member_rule(snapshot, resource):
+    """用户是资源所属用户组的成员"""
+    return resource.get("group_id") in snapshot["groups"]
+
+
+class PermissionSnapshotCache(object):
+    """
+    用户权限快照缓存
+    快照格式: {"grade_managers": [1, 2], "groups": [3, 4], "refreshed_at": 1690000000.0}
+    """
+
+    cache_key_prefix = "iam_snapshot"
+    version_key = "iam_snapshot:version"
+
+    def __init__(self, ttl=None, refresh_interval=None, page_size=100):
+        self.ttl = ttl or constants.IAM_SNAPSHOT_CACHE_TTL
+        self.refresh_interval = refresh_interval or constants.IAM_SNAPSHOT_REFRESH_INTERVAL
+        self.page_size = page_size
+        self.action_rules = {
+            ACTION_GRADE_MANAGER_MEMBER: grade_manager_member_rule,
+            ACTION_GROUP_MEMBER: group_member_rule,
+        }
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def register_action(self, action, rule):
+        """
+        注册动作的判定规则
+        :param action: 动作名
+        :param rule: rule(snapshot, resource) -> bool
+        """
+        self.action_rules[action] = rule
+
+    @property
+    def version(self):
+        return cache.get(self.version_key) or 0
+
+    def invalidate_all(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+
+    def cache_key(self, username):
+        return "{}:{}:{}".format(self.cache_key_prefix, self.version, username)
+
+    def get_snapshot(self, username):
+        snapshot = cache.get(self.cache_key(username))
+        if snapshot is None:
+            return self.refresh(username)
+        if time.time() - snapshot["refreshed_at"] > self.refresh_interval:
+            self.refresh_in_background(username)
+        return snapshot
+
+    def refresh(self, username):
+        snapshot = self.load_snapshot(username)
+        cache.set(self.cache_key(username), snapshot, self.ttl)
+        return snapshot
+
+    def refresh_in_background(self, username):
+        with self._lock:
+            if username in self._refreshing:
+                return
+            self._refreshing.add(username)
+
+        def _refresh():
+            try:
+                self.refresh(username)
+            except Exception:
+                logger.exception("后台刷新IAM权限快照失败, username={}".format(username))
+            finally:
+                with self._lock:
+                    self._refreshing.discard(username)
+
+        InheritParentThread(target=_refresh, daemon=True).start()
+
+    def load_snapshot(self, username):
+        """从IAM查询用户的分级管理员及用户组"""
+        client = get_client_by_user(constants.ADMIN_USERNAME_LIST[0])
+        grade_managers = self._list_all(client.iam.get_user_grade_managers, {"user_id": username})
+        groups = []
+        for grade_manager in grade_managers:
+            groups.extend(
+                self._list_all(
+                    client.iam.get_user_grade_manager_user_groups,
+                    {"user_id": username, "grade_manager_id": grade_manager["id"]},
+                )
+            )
+        return {
+            "grade_managers": [i["id"] for i in grade_managers],
+            "groups": [i["id"] for i in groups],
+            "refreshed_at": time.time(),
+        }
+
+    def _list_all(self, api, params):
+        """按页获取全部数据，兼容返回列表或{"count", "results"}两种格式"""
+        results, page = [], 1
+        while True:
+            res = api(dict(params, page=page, page_size=self.page_size))
+            if not res.get("result"):
+                raise ValueError("查询IAM数据失败, url={}, message={}".format(api.url, res.get("message")))
+            data = res.get("data") or []
+            if isinstance(data, list):
+                results.extend(data)
+                return results
+            batch = data.get("results", [])
+            results.extend(batch)
+            if not batch or len(results) >= data.get("count", 0):
+                return results
+            page += 1
+
+    def is_grade_manager_member(self, username, grade_manager_id):
+        return grade_manager_id in self.get_snapshot(username)["grade_managers"]
+
+    def is_group_member(self, username, group_id):
+        return group_id in self.get_snapshot(username)["groups"]
+
+    def allowed_many(self, username, actions, resources):
+        """
+        批量鉴权，只读取一次用户快照
+        :param username: 用户名
+        :param actions: 动作列表
+        :param resources: 资源列表 [{"id": 1, "grade_manager_id": 1, "group_id": 2}, ...]
+        :return: {action: {resource_id: bool}}
+        """
+        snapshot = self.get_snapshot(username)
+        result = {}
+        for action in actions:
+            rule = self.action_rules.get(action)
+            if rule is None:
+                raise ValueError("未注册的IAM动作: {}".format(action))
+            result[action] = {resource["id"]: bool(rule(snapshot, resource)) for resource in resources}
+        return result
+
+
+permission_snapshot = PermissionSnapshotCache()
+
+
+def invalidate_on_iam_write(api, data, result):
+    """IAM写接口调用成功后失效所有快照"""
+    permission_snapshot.invalidate_all()
+
+
+def connect_iam_write_listener():
+    """注册IAM写接口的失效回调，在 AppConfig.ready() 中调用"""
+    ComponentAPIV2.add_write_listener(invalidate_on_iam_write)
@@ -1,22 +1,9 @@
 # -*- coding: utf-8 -*-
 #
-from functools import partial
+from werkzeug.local import LocalProxy
 
-from werkzeug.local import Local, LocalProxy
+from blueapps.utils.request_context import get_current_request, reset_current_request, set_current_request
 
-thread_local = Local()
+__all__ = ["set_current_request", "reset_current_request", "get_current_request", "current_request"]
 
-
-def set_current_request(request):
-    setattr(thread_local, "current_request", request)
-
-
-def _find(attr):
-    return getattr(thread_local, attr, None)
-
-
-def get_current_request():
-    return _find("current_request")
-
-
-current_request = LocalProxy(partial(_find, "current_request"))
+current_request = LocalProxy(get_current_request)
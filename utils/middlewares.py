@@ -1,16 +1,23 @@
 from django.utils.deprecation import MiddlewareMixin
 
-from utils.locals import set_current_request
+from blueapps.middleware.base import DualModeMiddleware
+from utils.locals import reset_current_request, set_current_request
 
 
-class RequestMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+class RequestMiddleware(DualModeMiddleware):
+    def call(self, request):
+        token = set_current_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_request(token)
 
-    def __call__(self, request):
-        set_current_request(request)
-        response = self.get_response(request)
-        return response
+    async def acall(self, request):
+        token = set_current_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_current_request(token)
 
 
 class CrossCSRF4WEOPS(MiddlewareMixin):
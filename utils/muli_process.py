@@ -7,6 +7,7 @@ from django import db
 from django.utils import timezone, translation
 
 from blueapps.utils.logger import logger
+from blueapps.utils.request_context import wrap_context
 from utils.local import local
 
 
@@ -16,7 +17,7 @@ class MultiProcess(ThreadPool):
         tz = timezone.get_current_timezone().zone
         lang = translation.get_language()
         items = [item for item in local]
-        return partial(run_func_with_local, items, tz, lang, func)
+        return wrap_context(partial(run_func_with_local, items, tz, lang, func))
 
     def map_ignore_exception(self, func, iterable, return_exception=False):
         """
@@ -106,6 +107,8 @@ class InheritParentThread(Thread):
         self.timezone = timezone.get_current_timezone().zone
         self.language = translation.get_language()
         super(InheritParentThread, self).__init__(*args, **kwargs)
+        # 继承父线程的请求上下文
+        self.run = wrap_context(self.run)
 
     def sync(self):
         for sync_item in self.inherit_data:
@@ -3,6 +3,7 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from django.conf import settings
 
 from blueapps.core.exceptions import ServerBlueException
+from blueapps.utils.request_context import wrap_context
 from utils.app_log import logger
 
 
@@ -17,8 +18,8 @@ class ThreadPool(object):
     def create_thread_pool(self):
         return ThreadPoolExecutor(max_workers=self.max_workers)
 
-    def submit(self, *args, **kwargs):
-        return self.pool.submit(*args, **kwargs)
+    def submit(self, fn, *args, **kwargs):
+        return self.pool.submit(wrap_context(fn), *args, **kwargs)
 
     def handle_result(self, shit):
         # 捕获线程执行中的错误，并抛出到主线程
@@ -33,7 +34,7 @@ class ThreadPool(object):
 
     def add_task(self, task, *args):
         """添加异步任务"""
-        task = self.pool.submit(task, *args)
+        task = self.pool.submit(wrap_context(task), *args)
         self.task_list.append(task)
         task.add_done_callback(self.handle_result)
 
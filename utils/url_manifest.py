@@ -0,0 +1,103 @@
+"""
+app 路由清单
+
+urls.py 原先在导入时遍历 apps/、apps_other/ 目录，并立即 include 每个 app 的 urls 模块
+改为读取部署时生成的清单文件(python manage.py build_url_manifest)，并以惰性方式挂载路由:
+只有请求路径匹配到该 app 的前缀(或反向解析 URL)时才导入其 urls 模块及视图
+
+清单中记录了每个 app 的 urls.py 内容摘要，加载时重新扫描目录并比对:
+新增/删除 app 或 urls.py、修改 urls.py 后清单自动失效，退化为目录扫描
+比对只读取 urls.py 文件内容，不依赖修改时间，重新检出代码后预先生成的清单仍然可用
+"""
+import hashlib
+import json
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "url_manifest.json")
+APP_ROOTS = ("apps", "apps_other")
+# 不自动挂载路由的 app
+EXCLUDED_APPS = ("system_mgmt",)
+
+
+def scan_apps():
+    """
+    扫描包含 urls.py 的 app 目录
+    :return: [{"prefix": "app", "module": "apps.app.urls", "digest": urls.py 内容摘要, "app_name": None}, ...]
+    """
+    entries = []
+    for root in APP_ROOTS:
+        root_path = os.path.join(PROJECT_ROOT, root)
+        if not os.path.isdir(root_path):
+            continue
+        for entry in sorted(os.scandir(root_path), key=lambda e: e.name):
+            if not entry.is_dir() or entry.name.startswith("__") or entry.name in EXCLUDED_APPS:
+                continue
+            urls_path = os.path.join(entry.path, "urls.py")
+            if os.path.isfile(urls_path):
+                module = "{}.{}.urls".format(root, entry.name)
+                digest = get_digest(urls_path)
+                entries.append({"prefix": entry.name, "module": module, "digest": digest, "app_name": None})
+    return entries
+
+
+def get_digest(path):
+    with open(path, "rb") as fp:
+        return hashlib.md5(fp.read()).hexdigest()
+
+
+def get_signature(entries):
+    return [(entry["prefix"], entry["module"], entry["digest"]) for entry in entries]
+
+
+def build_manifest(entries=None):
+    """
+    生成清单，导入各 app 的 urls 模块以记录 app_name(命名空间)，供惰性挂载时使用
+    """
+    from importlib import import_module
+
+    entries = scan_apps() if entries is None else entries
+    for entry in entries:
+        entry["app_name"] = getattr(import_module(entry["module"]), "app_name", None)
+    return {"apps": entries}
+
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = "{}.tmp".format(path)
+    with open(tmp_path, "w") as fp:
+        json.dump(manifest, fp, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path=MANIFEST_PATH, scanned=None):
+    """
+    :param scanned: 已扫描的 app 列表，不传时重新扫描
+    :return: 清单中的 app 列表，清单不存在或与目录中的 app 不一致时返回 None
+    """
+    try:
+        with open(path) as fp:
+            manifest = json.load(fp)
+        entries = manifest["apps"]
+        signature = get_signature(entries)
+    except (IOError, ValueError, KeyError, TypeError):
+        return None
+    scanned = scan_apps() if scanned is None else scanned
+    if signature != get_signature(scanned):
+        return None
+    return entries
+
+
+def get_app_urlpatterns():
+    from django.conf.urls import include, url
+
+    scanned = scan_apps()
+    entries = load_manifest(scanned=scanned)
+    if entries is None:
+        # 没有可用的清单时按目录扫描，app_name 未知，需要立即导入
+        return [url(r"^{}/".format(entry["prefix"]), include(entry["module"])) for entry in scanned]
+
+    # url() 接收 (模块路径, app_name, namespace) 时，URLResolver 在首次匹配或反向解析时才导入模块
+    return [
+        url(r"^{}/".format(entry["prefix"]), (entry["module"], entry["app_name"], entry["app_name"]))
+        for entry in entries
+    ]